@@ -0,0 +1,228 @@
+import operator
+import time
+import logging
+from alarm_state import AlarmPolicy, AlarmState, FIRING, EVENT_REMINDER, EVENT_RESOLVED
+
+# 比較運算子: (觸發條件, 是否為「低於」型, 是否為變化率)
+OPERATORS = {
+    '>=': (operator.ge, False, False),
+    '>': (operator.gt, False, False),
+    '<=': (operator.le, True, False),
+    '<': (operator.lt, True, False),
+    'rate>=': (operator.ge, False, True),  # 每秒上升量 >= 門檻
+    'rate<=': (operator.le, True, True),   # 每秒變化量 <= 門檻 (門檻為負數時表示下降)
+}
+DEFAULT_OPERATOR = '>='
+NEAR_MARGIN = 0.05  # 與門檻相差 5% 以內視為接近門檻
+
+
+def _sample(monitor, attribute, default):
+    return getattr(monitor.sample, attribute) if monitor.sample is not None else default
+
+
+def _swap_usage(monitor):
+    sample = monitor.sample
+    if sample is None or sample.swap_total == 0:
+        return 0
+    return round(sample.swap_used * 100 / sample.swap_total, 1)
+
+
+def _rail_power(target):
+    def accessor(monitor):
+        rail = _sample(monitor, 'rails', {}).get(target)
+        return rail[0] if rail is not None else 0
+    return accessor
+
+
+def _rail_average(target):
+    def accessor(monitor):
+        rail = _sample(monitor, 'rails', {}).get(target)
+        return rail[1] if rail is not None else 0  # tegrastats 的平均功率
+    return accessor
+
+
+# 定期紀錄期間到目前為止的能量 (J)
+def _rail_energy(target):
+    def accessor(monitor):
+        return round(monitor.vector_metrics.energy(target), 1) if monitor.vector_metrics is not None else 0
+    return accessor
+
+
+# 最新樣本所有核心的 max / min / mean / stdev (NumPy 向量)
+def _core_vector(group, how):
+    def accessor(monitor):
+        value = monitor.vector_metrics.reduce(group, how) if monitor.vector_metrics is not None else None
+        return value if value is not None else 0
+    return accessor
+
+
+def _drives(attribute):
+    def accessor(monitor):
+        return [(driveInfo.name, getattr(driveInfo, attribute)) for driveInfo in monitor.drives.values()]
+    return accessor
+
+
+def _cores(attribute):
+    def accessor(monitor):
+        return [(f'core{core}', value) for core, value in enumerate(_sample(monitor, attribute, ())) if value is not None]
+    return accessor
+
+
+# 單一數值的項目: (name, target) -> (accessor(monitor), 說明, 單位); target 為 None 表示不分 target
+SINGLE_METRICS = {
+    ('CPU', 'Usage'): (lambda monitor: monitor.cpu.usage, 'CPU usage', '%'),
+    ('CPU', 'Temperature'): (lambda monitor: monitor.cpu.temperature, 'CPU temperature', 'C'),
+    ('RAM', None): (lambda monitor: monitor.ram.usage, 'RAM usage', '%'),
+    ('GPU', 'Usage'): (lambda monitor: monitor.gpu.usage, 'GPU usage', '%'),
+    ('GPU', 'Temperature'): (lambda monitor: monitor.gpu.temperature, 'GPU temperature', 'C'),
+    ('SWAP', None): (_swap_usage, 'SWAP usage', '%'),
+    ('EMC', 'Usage'): (lambda monitor: _sample(monitor, 'emc_load', 0), 'EMC usage', '%'),
+    ('CPU', 'Core Usage Max'): (_core_vector('cpu.core.usage', 'max'), 'CPU busiest core usage', '%'),
+    ('CPU', 'Core Usage Stdev'): (_core_vector('cpu.core.usage', 'stdev'), 'CPU core usage stdev', '%'),
+    ('CPU', 'Core Frequency Min'): (_core_vector('cpu.core.frequency', 'min'), 'CPU lowest core frequency', 'MHz'),
+}
+
+# 多個實例的項目 (每顆硬碟 / 每顆核心各自一個狀態): (name, target) -> (accessor(monitor) -> [(instance, value)], 說明, 單位)
+MULTI_METRICS = {
+    ('Drive', 'Usage'): (_drives('usage'), 'usage', '%'),
+    ('Drive', 'Temperature'): (_drives('temperature'), 'temperature', 'C'),
+    ('CPU', 'Core Usage'): (_cores('cpu_loads'), 'usage', '%'),
+    ('CPU', 'Core Frequency'): (_cores('cpu_freqs'), 'frequency', 'MHz'),
+}
+
+# 實例會被移除的項目 (硬碟熱插拔): 目前樣本沒有的實例, 狀態直接丟棄; 核心數量固定, 離線的核心保留狀態
+PRUNED_METRICS = {('Drive', 'Usage'), ('Drive', 'Temperature')}
+
+
+# 編譯後的通報規則: accessor / 比較運算子 / 門檻都只計算一次
+class CompiledRule:
+    near_margin = NEAR_MARGIN
+
+    def __init__(self, item, accessor, multi: bool, label: str, unit: str, policy: AlarmPolicy) -> None:
+        self.item = item
+        self.accessor = accessor
+        self.multi = multi
+        self.label = label
+        self.unit = unit
+        self.policy = policy
+        self.threshold = float(item.threshold)
+        self.compare, self.below, self.rate = OPERATORS[item.operator or DEFAULT_OPERATOR]
+        # 恢復條件: 超過型低於 門檻 - hysteresis, 低於型高於 門檻 + hysteresis
+        self.clear_threshold = self.threshold + policy.hysteresis if self.below else self.threshold - policy.hysteresis
+        self.states = {}    # {instance: AlarmState}
+        self.previous = {}  # rate 規則用: {instance: (value, time)}
+        self.near = False   # 本次評估是否有實例接近門檻或正在等待 hold_time (adaptive 取樣使用)
+        self.prune = (item.name, item.target) in PRUNED_METRICS
+
+    def describe(self, instance, value) -> str:
+        label = f"{instance} {self.label}" if self.multi else self.label
+        if self.rate:
+            return f"{label} rate: {value:.2f}{self.unit}/s"
+        return f"{label}: {value}{self.unit}"
+
+    # 丟棄不在 instances 中的實例狀態 (拔除的硬碟)
+    def forget_missing(self, instances: set):
+        for instance in [instance for instance in self.states if instance not in instances]:
+            del self.states[instance]
+        for instance in [instance for instance in self.previous if instance not in instances]:
+            del self.previous[instance]
+
+    # 回傳 (instance, value, event) 或 None
+    def check(self, instance, value, now: float):
+        if self.rate:
+            previous = self.previous.get(instance)
+            self.previous[instance] = (value, now)
+            if previous is None or now <= previous[1]:
+                return None
+            value = (value - previous[0]) / (now - previous[1])
+        state = self.states.get(instance)
+        if state is None:
+            state = AlarmState(self.policy)
+            self.states[instance] = state
+        triggered = self.compare(value, self.threshold)
+        cleared = value > self.clear_threshold if self.below else value < self.clear_threshold
+        event = state.update(triggered, cleared, now)
+        if state.pending_since is not None and state.state != FIRING:
+            self.near = True
+        elif not triggered and abs(value - self.threshold) <= self.near_margin * max(abs(self.threshold), 1):
+            self.near = True
+        return (instance, value, event) if event is not None else None
+
+
+# 通報規則引擎: 每個 AlarmItem 只編譯一次, 每次 tick 只跑編譯後的規則
+class AlarmRuleEngine:
+
+    def __init__(self, policy_for, notify, logger: logging.Logger = None) -> None:
+        self.policy_for = policy_for  # policy_for(item) -> AlarmPolicy
+        self.notify = notify          # notify(description), 只在事件發生時呼叫
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.source = []              # 編譯時的 AlarmItem 清單
+        self.rules = []
+        self.near = False             # 上次評估是否有規則接近門檻
+
+    # 編譯通報項目, 仍存在的項目保留原本的規則與狀態
+    def compile(self, items: list):
+        previous = {id(rule.item): rule for rule in self.rules}
+        rules = []
+        for item in items:
+            rule = previous.get(id(item))
+            if rule is None:
+                rule = self.compile_item(item)
+            if rule is not None:
+                rules.append(rule)
+        self.rules = rules
+        self.source = list(items)
+
+    def compile_item(self, item):
+        try:
+            if (item.operator or DEFAULT_OPERATOR) not in OPERATORS:
+                raise ValueError(f"unknown operator {item.operator}")
+            policy = self.policy_for(item)
+            if (item.name, item.target) in MULTI_METRICS:
+                accessor, label, unit = MULTI_METRICS[(item.name, item.target)]
+                return CompiledRule(item, accessor, True, label, unit, policy)
+            metric = SINGLE_METRICS.get((item.name, item.target)) or SINGLE_METRICS.get((item.name, None))
+            if metric is None and item.name == 'Power':
+                metric = (_rail_power(item.target), f"{item.target} power", 'mW')
+            elif metric is None and item.name == 'Power Average':
+                metric = (_rail_average(item.target), f"{item.target} average power", 'mW')
+            elif metric is None and item.name == 'Energy':
+                metric = (_rail_energy(item.target), f"{item.target} energy", 'J')
+            if metric is None:
+                raise ValueError(f"unknown metric {item.name}/{item.target}")
+            accessor, label, unit = metric
+            return CompiledRule(item, accessor, False, label, unit, policy)
+        except Exception as e:
+            self.logger.error(f"compile alarm item error: {item.name}/{item.target} -> {e}")
+            return None
+
+    # 評估所有規則 (tick)
+    def evaluate(self, monitor, items: list, now: float = None):
+        if items != self.source:
+            self.compile(items)
+        now = time.monotonic() if now is None else now
+        near = False
+        for rule in self.rules:
+            rule.near = False
+            if rule.multi:
+                instances = rule.accessor(monitor)
+                for instance, value in instances:
+                    result = rule.check(instance, value, now)
+                    if result is not None:
+                        self.emit(rule, *result)
+                if rule.prune and len(rule.states) + len(rule.previous) > 0:
+                    rule.forget_missing({instance for instance, _ in instances})
+            else:
+                result = rule.check(None, rule.accessor(monitor), now)
+                if result is not None:
+                    self.emit(rule, *result)
+            near = near or rule.near
+        self.near = near
+
+    def emit(self, rule: CompiledRule, instance, value, event: str):
+        description = rule.describe(instance, value)
+        if event == EVENT_RESOLVED:
+            description = f"{description} (resolved)"
+        elif event == EVENT_REMINDER:
+            description = f"{description} (still firing)"
+        self.notify(description)
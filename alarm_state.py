@@ -0,0 +1,56 @@
+OK = 'OK'
+FIRING = 'FIRING'
+RESOLVED = 'RESOLVED'
+
+# update() 回傳的事件
+EVENT_FIRING = 'FIRING'
+EVENT_REMINDER = 'REMINDER'
+EVENT_RESOLVED = 'RESOLVED'
+
+
+# 通報條件的預設值, AlarmItem 沒有設定時使用
+class AlarmPolicy:
+    def __init__(self, hold_time = 0, hysteresis = 0, cooldown = 300, reminder_interval = 3600, notify_resolve = True) -> None:
+        self.hold_time = hold_time                  # 超過門檻持續多久才通報 (秒)
+        self.hysteresis = hysteresis                # 低於 門檻 - hysteresis 才算恢復
+        self.cooldown = cooldown                    # 同一項目兩次 FIRING 的最短間隔 (秒)
+        self.reminder_interval = reminder_interval  # FIRING 期間重複提醒的間隔 (秒), 0 = 不提醒
+        self.notify_resolve = notify_resolve        # 恢復時是否通報
+
+
+# 單一通報項目的狀態機: OK -> FIRING -> RESOLVED (-> FIRING ...)
+class AlarmState:
+
+    def __init__(self, policy: AlarmPolicy) -> None:
+        self.policy = policy
+        self.state = OK
+        self.pending_since = None  # 開始超過門檻的時間
+        self.last_fired = None     # 上次 FIRING 的時間
+        self.last_notified = None  # 上次送出 FIRING / REMINDER 的時間
+
+    # 以最新的判斷結果更新狀態, 只有狀態轉換或需要提醒時回傳事件, 否則回傳 None
+    # triggered: 數值符合通報條件; cleared: 數值已離開 hysteresis 範圍 (可恢復)
+    def update(self, triggered: bool, cleared: bool, now: float):
+        if self.state == FIRING:
+            if cleared:
+                self.state = RESOLVED
+                self.pending_since = None
+                return EVENT_RESOLVED if self.policy.notify_resolve else None
+            if self.policy.reminder_interval > 0 and now - self.last_notified >= self.policy.reminder_interval:
+                self.last_notified = now
+                return EVENT_REMINDER
+            return None
+
+        if not triggered:
+            self.pending_since = None
+            return None
+        if self.pending_since is None:
+            self.pending_since = now
+        if now - self.pending_since < self.policy.hold_time:
+            return None
+        if self.last_fired is not None and now - self.last_fired < self.policy.cooldown:
+            return None
+        self.state = FIRING
+        self.last_fired = now
+        self.last_notified = now
+        return EVENT_FIRING
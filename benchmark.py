@@ -0,0 +1,515 @@
+import argparse
+import contextlib
+import glob
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+import threading
+import logging
+from tegrastats_parser import TegrastatsParser
+from log_writer import shared_writer
+
+TEGRASTATS_LOGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tegrastats_logs')
+
+
+# 讀取合成的 tegrastats log (nano / tx2 / xavier / orin, 由 tegrastats_logs/generate_logs.py 產生, 不是實機錄製)
+def load_tegrastats_logs(logs_dir: str = TEGRASTATS_LOGS_DIR) -> dict:
+    logs = {}
+    for path in sorted(glob.glob(os.path.join(logs_dir, '*.log'))):
+        with open(path) as file:
+            logs[os.path.splitext(os.path.basename(path))[0]] = [line for line in file if line.strip()]
+    return logs
+
+
+# 每行解析成本 (us/line)
+def bench_parser(repeat: int) -> dict:
+    parser = TegrastatsParser()
+    results = {}
+    for board, lines in load_tegrastats_logs().items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for line in lines:
+                parser.parse(line)
+        elapsed = time.perf_counter() - start
+        results[board] = elapsed * 1e6 / (repeat * len(lines))
+    return results
+
+
+# 在暫存目錄建立無 Tk 的 HardwareMonitor_Linux (log 檔寫入暫存目錄, stdout 不輸出), 結束時停止監控並寫完 / 關閉 log
+@contextlib.contextmanager
+def temporary_monitor(sampler=None):
+    from hardwaremonitor_linux import HardwareMonitor_Linux, Switch
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        os.chdir(workdir)
+        try:
+            monitor = HardwareMonitor_Linux(sampler, variable_factory=Switch)
+            try:
+                yield monitor
+            finally:
+                monitor.stop_monitor()
+                monitor.logger_hardwaremonitor.removeHandler(monitor.queuehandler)
+                shared_writer.sync()  # write-behind 執行緒寫完後才關閉, 暫存目錄才能刪除
+                monitor.filehandler.close()
+        finally:
+            os.chdir(cwd)
+
+
+# 整體流程吞吐量 (samples/s): 以最快速度重播 log, 經過解析、通報判斷、寫入 log
+def bench_pipeline(repeat: int) -> dict:
+    from hardwaremonitor_linux import AlarmItem
+    from sampler import ReplaySampler
+
+    results = {}
+    for path in sorted(glob.glob(os.path.join(TEGRASTATS_LOGS_DIR, '*.log'))):
+        board = os.path.splitext(os.path.basename(path))[0]
+        with temporary_monitor(ReplaySampler(path, speed=0, repeat=repeat)) as monitor:
+            monitor.logging_period = '0'  # 每筆樣本都寫入 log
+            monitor.notification_items = [AlarmItem(name, target, '101') for name in ['CPU', 'GPU', 'Drive'] for target in ['Usage', 'Temperature']] + [AlarmItem('RAM', 'Usage', '101')]
+            monitor.enableNotifyToEzPro.set(1)
+            monitor.isRunning = True
+            count = 0
+            start = time.perf_counter()
+            while True:
+                sample = monitor.sampler.read()
+                if monitor.sampler.exhausted:
+                    break
+                monitor.process_sample(sample)
+                count += 1
+            results[board] = count / (time.perf_counter() - start)
+    return results
+
+
+def write_fake_file(root: str, path: str, content: str):
+    path = os.path.join(root, path.lstrip('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:  # 原地覆寫, 已開啟的 fd 讀到新的內容
+        file.write(content)
+
+
+# 假的 /proc/stat 第 step 份快照: 每份之間每顆核心增加 1000 jiffies, 其中第 n 顆核心忙碌 n * 5%
+def fake_proc_stat(cores: int, step: int = 0) -> str:
+    cpu_lines = ''.join(f'cpu{core} {1000 + core + step * core * 50} 0 {500 + core} {90000 + step * (1000 - core * 50)} 200 0 {10 + core} 0 0 0\n' for core in range(cores))
+    return f'cpu  20000 0 8000 1080000 2400 0 300 0 0 0\n{cpu_lines}intr 123456 0 0 0\nctxt 987654\n'
+
+
+# 建立假的 procfs / sysfs 目錄 (Orin 12 核心), 非 Jetson 環境也能測試 SysfsCollector
+def make_fake_sysfs(root: str, cores: int = 12):
+    write_fake_file(root, '/proc/stat', fake_proc_stat(cores))
+    write_fake_file(root, '/proc/meminfo', 'MemTotal:       31268520 kB\nMemFree:        25117044 kB\nMemAvailable:   26807488 kB\nSwapCached:            0 kB\nSwapTotal:      15634240 kB\nSwapFree:       15634240 kB\n')
+    for core in range(cores):
+        write_fake_file(root, f'/sys/devices/system/cpu/cpu{core}/cpufreq/scaling_cur_freq', '2201600\n')
+    for zone, name in enumerate(['cpu-thermal', 'gpu-thermal', 'cv0-thermal', 'soc0-thermal', 'soc1-thermal', 'soc2-thermal', 'tj-thermal']):
+        write_fake_file(root, f'/sys/class/thermal/thermal_zone{zone}/type', f'{name}\n')
+        write_fake_file(root, f'/sys/class/thermal/thermal_zone{zone}/temp', f'{43000 + zone * 1000}\n')
+    write_fake_file(root, '/sys/devices/platform/17000000.ga10b/load', '713\n')
+
+
+# SysfsCollector 讀取假目錄的結果檢查; 第二份 /proc/stat 快照讓 CPU 使用率的差值計算實際執行
+# 回傳 [(項目, 是否通過, 說明)]
+def check_fake_sysfs(cores: int = 12) -> list:
+    from sysfs_collector import SysfsCollector
+    from tegrastats_parser import TegrastatsSample
+
+    with tempfile.TemporaryDirectory() as root:
+        make_fake_sysfs(root, cores)
+        collector = SysfsCollector(root)
+        first = collector.read_into(TegrastatsSample())
+        write_fake_file(root, '/proc/stat', fake_proc_stat(cores, 1))
+        sample = collector.read_into(TegrastatsSample())
+        collector.close()
+    expected_loads = [core * 5 for core in range(cores)]
+    return [
+        ('cpu baseline', first.cpu_loads == [], f'first read {first.cpu_loads}'),
+        ('cpu usage', sample.cpu_loads == expected_loads and sample.cpu_usage == 27.5, f'{sample.cpu_loads} -> {sample.cpu_usage}%'),
+        ('cpu frequency', sample.cpu_freqs == [2201] * cores, f'{sample.cpu_freqs[:2]}... MHz'),
+        ('ram', (sample.ram_used, sample.ram_total, sample.swap_used) == (4356, 30535, 0), f'{sample.ram_used}/{sample.ram_total} MB, swap {sample.swap_used} MB'),
+        ('thermal', (sample.cpu_temperature, sample.gpu_temperature) == (43, 44), f'cpu {sample.cpu_temperature}C, gpu {sample.gpu_temperature}C'),
+        ('gpu load', sample.gpu_usage == 71, f'{sample.gpu_usage}%'),
+    ]
+
+
+# 每筆樣本的 CPU 成本 (us/sample): SysfsCollector vs tegrastats
+# tegrastats 包含程序本身 (RUSAGE_CHILDREN) + pipe 讀取 + 解析, 沒有 tegrastats 時只能量測解析 ('tegrastats parse only')
+def bench_collector(repeat: int, root: str = None, tegrastats: str = None) -> dict:
+    from hardwaremonitor_linux import CPUInfo, RAMInfo, GPUInfo
+    from sysfs_collector import SysfsCollector
+    from sampler import TegrastatsSampler
+
+    results = {}
+    cpu, ram, gpu = CPUInfo(), RAMInfo(), GPUInfo()
+    with tempfile.TemporaryDirectory() as fake_root:
+        if root is None:
+            make_fake_sysfs(fake_root)
+            root = fake_root
+        collector = SysfsCollector(root)
+        collector.collect(cpu, ram, gpu)
+        start = time.process_time()
+        for _ in range(repeat):
+            collector.collect(cpu, ram, gpu)
+        results['sysfs'] = (time.process_time() - start) * 1e6 / repeat
+        collector.close()
+
+    command = tegrastats or shutil.which('tegrastats')
+    if command is not None:
+        count = min(repeat, 200)  # 依 --interval 實際等待, 筆數不宜太多
+        sampler = TegrastatsSampler(command.split(), interval=0.02)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.process_time()
+        sampler.start()
+        for _ in range(count):
+            sample = sampler.read()
+            if sample is None:
+                break
+            cpu.usage, ram.usage, gpu.usage = sample.cpu_usage, sample.ram_usage, sample.gpu_usage
+        own = time.process_time() - start
+        sampler.stop()  # wait() 之後 tegrastats 的 CPU 時間才計入 RUSAGE_CHILDREN
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        child = (after.ru_utime + after.ru_stime) - (children.ru_utime + children.ru_stime)
+        results['tegrastats'] = (own + child) * 1e6 / count
+
+    parser = TegrastatsParser()
+    lines = load_tegrastats_logs()['orin']
+    start = time.perf_counter()
+    for index in range(repeat):
+        sample = parser.parse(lines[index % len(lines)])
+        cpu.usage, ram.usage, gpu.usage = sample.cpu_usage, sample.ram_usage, sample.gpu_usage
+        cpu.temperature, gpu.temperature = int(sample.cpu_temperature), int(sample.gpu_temperature)
+    results['tegrastats parse only'] = (time.perf_counter() - start) * 1e6 / repeat
+    return results
+
+
+# 每次 tick 評估通報規則的成本 (us/tick)
+def bench_rules(repeat: int, count: int = 1000) -> float:
+    from hardwaremonitor_linux import AlarmItem
+    from hardware_info import DriveInfo
+
+    with temporary_monitor() as monitor:
+        monitor.sample = TegrastatsParser().parse(load_tegrastats_logs()['orin'][0])
+        monitor.drives = {name: DriveInfo(name, 50, 40) for name in ['/dev/nvme0n1p1', '/dev/mmcblk0p1']}
+        metrics = [('CPU', 'Usage', '>='), ('CPU', 'Temperature', '>'), ('RAM', 'Usage', '>='), ('GPU', 'Usage', '>='),
+                   ('GPU', 'Temperature', '>='), ('Drive', 'Usage', '>='), ('CPU', 'Core Usage', '>='),
+                   ('SWAP', 'Usage', '>='), ('Power', 'VDD_GPU_SOC', '>='), ('CPU', 'Temperature', 'rate>=')]
+        monitor.notification_items = [AlarmItem(name, target, str(90 + index % 10), operator=operator)
+                                      for index, (name, target, operator) in ((index, metrics[index % len(metrics)]) for index in range(count))]
+        monitor.enableNotifyToEzPro.set(1)
+        monitor.notification_batcher.submit = lambda message: True  # 只計算規則評估
+        monitor.send_notification()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            monitor.send_notification()
+        elapsed = time.perf_counter() - start
+    return elapsed * 1e6 / repeat
+
+
+# 目前程序的寫入 syscall 次數與 bytes (/proc/self/io)
+def read_process_io() -> tuple:
+    counters = {}
+    with open('/proc/self/io') as file:
+        for line in file:
+            name, value = line.split(':')
+            counters[name] = int(value)
+    return counters['syscw'], counters['wchar']
+
+
+# 模擬 hours 小時的 log (每秒一筆通報 + 每 10 分鐘一筆定期紀錄): 每筆直接寫入 vs 延後寫入的 syscall 與 bytes
+def bench_logging(hours: int = 1, alarms_per_second: int = 1) -> dict:
+    from log_rotation import DailyFileHandler
+    from log_writer import WriteBehindWriter
+
+    formatter = logging.Formatter('%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+    periodic = 'cpu usage:12.5 (min/avg/max/p95 3/12.1/48/40), cpu temperature:45 (min/avg/max/p95 44/45.2/47/47); ram usage:38.2 (min/avg/max/p95 38/38.1/38.4/38.3); '
+    notification = 'send notification sucess: {"EventName": "CPU usage: 95.5%", "Severity": 2}'
+
+    def records(start):
+        for second in range(hours * 3600):
+            for _ in range(alarms_per_second):
+                yield start + second, notification
+            if second % 600 == 0:
+                yield start + second, periodic
+
+    def make_record(created, message):
+        record = logging.LogRecord('HARDWAREMONITOR', logging.INFO, __file__, 0, message, None, None)
+        record.created, record.msecs = created, 0
+        return record
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.time()
+        handler = DailyFileHandler('direct', directory=workdir)
+        handler.setFormatter(formatter)
+        before = read_process_io()
+        for created, message in records(start):
+            handler.handle(make_record(created, message))
+        after = read_process_io()
+        handler.close()
+        results['direct'] = (after[0] - before[0], after[1] - before[1])
+
+        handler = DailyFileHandler('batched', directory=workdir)
+        handler.setFormatter(formatter)
+        writer = WriteBehindWriter()  # 以模擬時間驅動, 不啟動執行緒
+        before = read_process_io()
+        for created, message in records(start):
+            writer.add(handler, make_record(created, message), now=created)
+            writer.maybe_flush(created)
+        writer.flush()
+        after = read_process_io()
+        handler.close()
+        results['write-behind'] = (after[0] - before[0], after[1] - before[1])
+    return {mode: (syscalls / hours, written / hours) for mode, (syscalls, written) in results.items()}
+
+
+# 冷啟動分析: 以 -X importtime 啟動 daemon (重播 log), 處理完第一筆樣本後結束
+# 回傳 ({階段: ms}, [(模組, 累計 ms)] 由大到小)
+def bench_startup() -> tuple:
+    import subprocess
+    import sys
+
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'hardwaremonitor', '--daemon', '--profile-startup',
+                                 '--replay', os.path.join(TEGRASTATS_LOGS_DIR, 'orin.log')],
+                                cwd=workdir, env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__))),
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=120)
+    stages = {}
+    imports = []
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:'):
+            fields = line[len('import time:'):].split('|')
+            if len(fields) == 3 and fields[0].strip().isdigit() and not fields[2].startswith('  '):  # 只統計最上層的 import
+                imports.append((fields[2].strip(), int(fields[1]) / 1000))
+        elif line.startswith('startup '):
+            stage, value = line[len('startup '):].split(':')
+            stages[stage] = float(value.split()[0])
+    return stages, sorted(imports, key=lambda item: item[1], reverse=True)
+
+
+# 本機的 EZPro 替身: 沒有 Authorization 時回 401 Digest challenge, 記錄收到的 createEvent 與連線 (HTTP/1.1 keep-alive)
+class StubEZPro:
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures  # 前幾次 createEvent 回 503
+        self.events = []          # 成功收到的 event (json)
+        self.attempts = 0         # 帶有 Authorization 的 createEvent 次數
+        self.challenges = 0       # 回 401 的次數
+        self.connections = set()  # client (ip, port)
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        from ezproserver import EZProServer
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.connections.add(self.client_address)
+                if not self.headers.get('Authorization', '').startswith('Digest '):
+                    stub.challenges += 1
+                    self.reply(401, {'WWW-Authenticate': 'Digest realm="ezpro", nonce="0123456789abcdef", qop="auth", algorithm=MD5'})
+                    return
+                stub.attempts += 1
+                if stub.failures > 0:
+                    stub.failures -= 1
+                    self.reply(503)
+                    return
+                stub.events.append(json.loads(body))
+                self.reply(200)
+
+            def reply(self, status, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return EZProServer('127.0.0.1', str(self.server.server_address[1]), 'admin', 'password')
+
+    # 等到收到 count 筆 event (最多 timeout 秒), 再多等 settle 秒確認沒有多送
+    def wait_events(self, count: int, timeout: float = 5, settle: float = 0.5):
+        deadline = time.monotonic() + timeout
+        while len(self.events) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(settle)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# 通報佇列對 StubEZPro 的檢查: Session 重複使用連線與 Digest nonce, 5xx 重試, 佇列滿時丟棄最舊的通報
+# 回傳 [(項目, 是否通過, 說明)]
+def bench_dispatcher() -> list:
+    from notification_dispatcher import NotificationDispatcher
+
+    checks = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        stub = StubEZPro()
+        dispatcher = NotificationDispatcher(stub.start(), backoff=0.05)
+        dispatcher.start()
+        for index in range(5):
+            dispatcher.submit(json.dumps({'description': f'event {index}'}))
+        stub.wait_events(5)
+        dispatcher.stop()
+        stub.stop()
+        checks.append(('keep-alive', len(stub.events) == 5 and len(stub.connections) == 1 and stub.challenges == 1,
+                       f'{len(stub.events)} events, {len(stub.connections)} connections, {stub.challenges} digest challenges'))
+
+        stub = StubEZPro(failures=2)
+        dispatcher = NotificationDispatcher(stub.start(), retries=3, backoff=0.05)
+        dispatcher.start()
+        dispatcher.submit(json.dumps({'description': 'retry'}))
+        stub.wait_events(1)
+        dispatcher.stop()
+        stub.stop()
+        checks.append(('retry', len(stub.events) == 1 and stub.attempts == 3, f'{len(stub.events)} events after {stub.attempts} attempts'))
+
+    logger = logging.getLogger('benchmark.dispatcher')
+    logger.disabled = True  # 丟棄通報的錯誤訊息
+    dispatcher = NotificationDispatcher(None, logger=logger, max_queue=3)  # 不啟動, 只檢查佇列
+    for index in range(5):
+        dispatcher.submit(f'{index}')
+    queued = [dispatcher.queue.get_nowait() for _ in range(dispatcher.queue.qsize())]
+    checks.append(('overflow', queued == ['2', '3', '4'] and dispatcher.dropped == 2, f'queued {queued}, dropped {dispatcher.dropped}'))
+    return checks
+
+
+# OpenMetrics endpoint 的檢查: 處理一筆樣本後以 HTTP client 讀取 /metrics, 並量測每次 scrape 的時間
+def bench_metrics(repeat: int) -> list:
+    import urllib.request
+    import urllib.error
+    from hardwaremonitor_linux import AlarmItem
+
+    checks = []
+    with temporary_monitor() as monitor:
+        monitor.notification_items = [AlarmItem('CPU', 'Usage', '0')]
+        monitor.enable_metrics_server(0, '127.0.0.1')
+        monitor.apply_pending_outputs()  # 平常由監控執行緒套用
+        url = f'http://127.0.0.1:{monitor.metrics_server.port}/metrics'
+        monitor.process_sample(TegrastatsParser().parse(load_tegrastats_logs()['orin'][0]))
+        with urllib.request.urlopen(url, timeout=5) as response:
+            content_type = response.headers['Content-Type']
+            body = response.read().decode()
+        lines = body.splitlines()
+        checks.append(('format', content_type.startswith('application/openmetrics-text') and body.endswith('# EOF\n'), content_type))
+        cpu_usage = f'hardwaremonitor_cpu_usage_percent {float(monitor.cpu.usage)!r}'
+        checks.append(('values', cpu_usage in lines, cpu_usage))
+        firing = [line for line in lines if line.startswith('hardwaremonitor_alarm_firing{')]
+        checks.append(('alarm', len(firing) == 1 and firing[0].endswith(' 1'), firing))
+        try:
+            urllib.request.urlopen(url.replace('/metrics', '/other'), timeout=5)
+            status = 200
+        except urllib.error.HTTPError as e:
+            status = e.code
+        checks.append(('not found', status == 404, f'/other -> {status}'))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            with urllib.request.urlopen(url, timeout=5) as response:
+                response.read()
+        elapsed = time.perf_counter() - start
+        checks.append(('scrape', True, f'{elapsed * 1000 / repeat:.2f} ms/scrape, {len(body)} bytes'))
+    return checks
+
+
+# 合併通報的檢查: 同一次 tick 觸發多個 alarm, 或 window 內跨多次 tick 的通報, 都只對 StubEZPro 送出一個 createEvent
+def bench_notify() -> list:
+    from hardwaremonitor_linux import AlarmItem
+
+    checks = []
+    stub = StubEZPro()
+    ezpro = stub.start()
+    try:
+        with temporary_monitor() as monitor:
+            monitor.ezpro.ip, monitor.ezpro.port, monitor.ezpro.username, monitor.ezpro.password = ezpro.ip, ezpro.port, ezpro.username, ezpro.password
+            monitor.notification_items = [AlarmItem(name, target, '0') for name, target in [('CPU', 'Usage'), ('CPU', 'Temperature'), ('RAM', 'Usage'), ('GPU', 'Temperature')]]
+            monitor.enableNotifyToEzPro.set(1)
+            monitor.notification_dispatcher.start()
+            monitor.process_sample(TegrastatsParser().parse(load_tegrastats_logs()['orin'][0]))
+            stub.wait_events(1)
+            events = [len(event.get('events', [event])) for event in stub.events]
+            checks.append(('tick', events == [4], f'4 alarms -> {len(stub.events)} requests {events}'))
+
+            stub.events.clear()
+            batcher = monitor.notification_batcher
+            batcher.window = 1.0
+            batcher.add('alarm 1', now=0)
+            batcher.add('alarm 2', now=0)
+            batcher.tick(now=0.4)
+            batcher.add('alarm 3', now=0.6)
+            batcher.tick(now=0.9)
+            sent_early = len(stub.events) > 0 or not monitor.notification_dispatcher.queue.empty()
+            batcher.tick(now=1.0)
+            stub.wait_events(1)
+            events = [len(event.get('events', [event])) for event in stub.events]
+            checks.append(('window', not sent_early and events == [3], f'3 alarms in 3 ticks -> {len(stub.events)} requests {events}'))
+    finally:
+        stub.stop()
+    return checks
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='hardware monitor benchmarks')
+    argparser.add_argument('target', choices=['parser', 'pipeline', 'collector', 'rules', 'logging', 'startup', 'dispatcher', 'metrics', 'notify'])
+    argparser.add_argument('--repeat', type=int, default=100)
+    argparser.add_argument('--budget', type=float, default=1500, help='startup: 第一筆樣本的時間上限 (ms), 超過時回傳 1')
+    argparser.add_argument('--root', default=None, help='collector: 使用實際的 procfs / sysfs 根目錄 (預設為假目錄)')
+    argparser.add_argument('--tegrastats', default=None, help='collector: tegrastats 指令 (預設從 PATH 尋找)')
+    args = argparser.parse_args()
+
+    if args.target == 'parser':
+        for board, cost in bench_parser(args.repeat).items():
+            print(f'parser {board}: {cost:.2f} us/line')
+    elif args.target == 'pipeline':
+        for board, throughput in bench_pipeline(args.repeat).items():
+            print(f'pipeline {board}: {throughput:.1f} samples/s')
+    elif args.target == 'collector':
+        if args.root is None:
+            report_checks('collector', check_fake_sysfs())
+        for source, cost in bench_collector(args.repeat, args.root, args.tegrastats).items():
+            print(f'collector {source}: {cost:.2f} us/sample')
+    elif args.target == 'rules':
+        print(f'rules 1000: {bench_rules(args.repeat):.1f} us/tick')
+    elif args.target == 'logging':
+        for mode, (syscalls, written) in bench_logging().items():
+            print(f'logging {mode}: {syscalls:.0f} write syscalls/h, {written / 1024:.1f} KiB/h')
+    elif args.target == 'startup':
+        stages, imports = bench_startup()
+        for module, cost in imports[:15]:
+            print(f'import {module}: {cost:.1f} ms')
+        for stage, cost in stages.items():
+            print(f'startup {stage}: {cost:.0f} ms')
+        first_sample = stages.get('first sample')
+        if first_sample is None or first_sample > args.budget:
+            print(f'startup budget exceeded: {first_sample} ms > {args.budget:.0f} ms')
+            raise SystemExit(1)
+    elif args.target == 'dispatcher':
+        report_checks('dispatcher', bench_dispatcher())
+    elif args.target == 'metrics':
+        report_checks('metrics', bench_metrics(args.repeat))
+    elif args.target == 'notify':
+        report_checks('notify', bench_notify())
+
+
+# 印出檢查結果, 有失敗時回傳 1
+def report_checks(target: str, checks: list):
+    for name, passed, detail in checks:
+        print(f'{target} {name}: {"ok" if passed else "FAIL"} ({detail})')
+    if not all(passed for _, passed, _ in checks):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
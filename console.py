@@ -0,0 +1,7 @@
+# 每筆樣本的除錯輸出 (RAM / CPU / GPU, 硬碟使用量, 通報內容): GUI 照常印出, daemon 只有 --verbose 時印出 (避免 journald 每秒寫入)
+verbose = True
+
+
+def debug_print(message: str):
+    if verbose:
+        print(message)
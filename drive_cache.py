@@ -0,0 +1,112 @@
+import os
+import re
+import json
+import subprocess
+import time
+import threading
+import logging
+
+# /dev/sda1 -> sda, /dev/nvme0n1p1 -> nvme0n1, /dev/mmcblk0p1 -> mmcblk0
+_PARTITION_PATTERN = re.compile(r'^((?:nvme\d+n\d+)|(?:mmcblk\d+)|(?:[a-z]+))p?\d*$')
+
+
+class DriveCacheEntry:
+    def __init__(self, disk: str) -> None:
+        self.disk = disk
+        self.temperature = 0
+        self.refreshed_at = None    # 上次更新溫度的時間 (monotonic)
+        self.requested_at = None    # 上次被查詢的時間 (monotonic)
+
+
+# 硬碟溫度快取: smartctl 只檢查一次、同一顆實體硬碟的分割區共用一筆, 溫度依 refresh_interval 更新
+class DriveTelemetryCache:
+
+    def __init__(self, refresh_interval: float = 300, ttl: float = 900, smartctl_timeout: float = 10, logger: logging.Logger = None) -> None:
+        self.refresh_interval = refresh_interval  # 溫度更新間隔 (秒)
+        self.ttl = ttl                            # 超過此時間未被查詢的硬碟會被移除 (秒)
+        self.smartctl_timeout = smartctl_timeout  # 每次 smartctl 的時間上限 (秒), 逾時會結束 smartctl, 不會佔住 drive_poller 的執行緒
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.smartctl_installed = None
+        self.entries = {}     # {disk: DriveCacheEntry}
+        self.disk_names = {}  # {partition device: disk}
+        self.lock = threading.Lock()  # drive_poller 會從多個執行緒查詢
+
+    # 檢查是否安裝 smartmontools (只執行一次)
+    def is_smartmontools_installed(self) -> bool:
+        with self.lock:
+            if self.smartctl_installed is None:
+                self.check_smartmontools()
+        return self.smartctl_installed
+
+    def check_smartmontools(self):
+        try:
+            subprocess.run(['smartctl', '--version'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.smartctl_installed = True
+        except subprocess.CalledProcessError:
+            self.logger.error("smartctl is installed but there was a problem running it.")
+            self.smartctl_installed = False
+        except FileNotFoundError:
+            self.logger.error("smartmontools is not installed.")
+            print("Please install smartmontools to proceed.")
+            self.smartctl_installed = False
+
+    # 分割區對應的實體硬碟 (/dev/sda1 -> /dev/sda)
+    def get_disk(self, partition_device: str) -> str:
+        with self.lock:  # evict() 會在其他執行緒刪除 disk_names 的項目
+            disk = self.disk_names.get(partition_device)
+        if disk is None:
+            disk = self.resolve_disk(partition_device)  # 讀取 /sys, 不持有 lock
+            with self.lock:
+                self.disk_names[partition_device] = disk
+        return disk
+
+    @staticmethod
+    def resolve_disk(partition_device: str) -> str:
+        if not partition_device.startswith('/dev/'):
+            return partition_device
+        name = os.path.basename(os.path.realpath(partition_device))
+        sys_path = os.path.realpath(f'/sys/class/block/{name}')
+        if os.path.exists(os.path.join(sys_path, 'partition')):
+            return f'/dev/{os.path.basename(os.path.dirname(sys_path))}'
+        if os.path.exists(sys_path):
+            return f'/dev/{name}'
+        match = _PARTITION_PATTERN.match(name)
+        return f'/dev/{match.group(1)}' if match else partition_device
+
+    # 取得分割區所在硬碟的溫度, 快取過期時才重新讀取
+    def get_temperature(self, partition_device: str) -> int:
+        if not self.is_smartmontools_installed():
+            return 0
+        now = time.monotonic()
+        disk = self.get_disk(partition_device)
+        with self.lock:
+            entry = self.entries.get(disk)
+            if entry is None:
+                entry = DriveCacheEntry(disk)
+                self.entries[disk] = entry
+            entry.requested_at = now
+            self.evict(now)
+        if entry.refreshed_at is None or now - entry.refreshed_at >= self.refresh_interval:
+            self.refresh(entry)
+            entry.refreshed_at = now
+        return entry.temperature
+
+    # 以 smartctl -A -j 讀取溫度 (smartmontools 7+), 逾時時保留上一次的值
+    def refresh(self, entry: DriveCacheEntry):
+        try:
+            result = subprocess.run(['smartctl', '-A', '-j', entry.disk], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=self.smartctl_timeout)
+            entry.temperature = json.loads(result.stdout).get('temperature', {}).get('current') or 0  # exit status 的警告位元不影響輸出
+        except subprocess.TimeoutExpired:
+            self.logger.error(f'get device temperature timeout: {entry.disk}')
+        except Exception as e:
+            print(f'get device temperature error: {e}')
+            self.logger.error(f'get device temperature error: {e}')
+            entry.temperature = 0
+
+    # 移除超過 ttl 未被查詢的硬碟 (例如已拔除)
+    def evict(self, now: float):
+        expired = [disk for disk, entry in self.entries.items() if now - entry.requested_at > self.ttl]
+        for disk in expired:
+            del self.entries[disk]
+            for partition_device in [device for device, name in self.disk_names.items() if name == disk]:
+                del self.disk_names[partition_device]
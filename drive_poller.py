@@ -0,0 +1,91 @@
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from drive_cache import DriveTelemetryCache
+from hardware_info import DriveInfo
+from console import debug_print
+
+
+# 在背景執行緒取得硬碟使用量 / 溫度, 每顆實體硬碟一個工作, 逾時的硬碟保留上一次的值
+class DrivePoller:
+
+    def __init__(self, cache: DriveTelemetryCache, publish, interval: float = 1, timeout: float = 10, max_workers: int = 4, logger: logging.Logger = None) -> None:
+        self.cache = cache
+        self.publish = publish    # publish(drives: dict), 每輪完成後以新的 dict 整個替換
+        self.interval = interval  # 每輪間隔 (秒)
+        self.timeout = timeout    # 每輪等待硬碟的最長時間 (秒)
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='drive-poller')
+        self.pending = {}  # {disk: Future}, 尚未完成 (例如 smartctl 卡住) 的硬碟不會重複送出
+        self.drives = {}   # 上一次發佈的結果
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name='drive-poller', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.poll()
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # 執行一輪並發佈結果
+    def poll(self) -> dict:
+        try:
+            import psutil  # drive usage (在背景執行緒載入, 不影響啟動時間)
+            partitions_by_disk = {}
+            for partition in psutil.disk_partitions():
+                if 'cdrom' in partition.opts or partition.fstype == '':
+                    continue
+                partitions_by_disk.setdefault(self.cache.get_disk(partition.device), []).append(partition)
+
+            submitted = []
+            for disk, partitions in partitions_by_disk.items():
+                if disk not in self.pending:
+                    self.pending[disk] = self.executor.submit(self.read_disk, partitions)
+                    submitted.append(self.pending[disk])
+            wait(submitted, timeout=self.timeout)  # 上一輪仍卡住的硬碟不再等待
+
+            drives = {}
+            for disk, partitions in partitions_by_disk.items():
+                future = self.pending.get(disk)
+                if future is not None and future.done():
+                    del self.pending[disk]
+                    try:
+                        for driveInfo in future.result():
+                            drives[driveInfo.name] = driveInfo
+                        continue
+                    except Exception as e:
+                        self.logger.error(f'get drives info error: {e}')
+                else:
+                    self.logger.error(f'get drives info timeout: {disk}')
+                for partition in partitions:
+                    if partition.device in self.drives:
+                        drives[partition.device] = self.drives[partition.device]
+
+            self.drives = drives
+            self.publish(drives)
+        except Exception as e:
+            self.logger.error(f'get drives info error: {e}')
+        return self.drives
+
+    # 取得同一顆硬碟所有分割區的資訊
+    def read_disk(self, partitions: list) -> list:
+        import psutil
+        result = []
+        for partition in partitions:
+            usage = psutil.disk_usage(partition.mountpoint)
+            debug_print(f"drive({partition.device}) usage: {round(usage.percent)}%")
+            temperature = self.cache.get_temperature(partition.device)
+            result.append(DriveInfo(partition.device, round(usage.percent, 1), temperature))
+        return result
@@ -0,0 +1,121 @@
+import time
+import socket
+import threading
+import logging
+from ezproserver import EZProServer
+
+# 檢查結果代碼 (沿用 EZProNotification.test_ezpro_server_connection 的定義), 其他失敗為說明字串
+INVALID = '1'      # 內容輸入有誤
+UNREACHABLE = '2'  # IP / Port 無法連線
+CONNECTED = '3'    # 伺服器連線成功
+
+
+class HealthResult:
+    __slots__ = ('code', 'detail', 'checked_at')
+
+    def __init__(self, code: str, detail: str = '', checked_at: float = None) -> None:
+        self.code = code
+        self.detail = detail
+        self.checked_at = time.monotonic() if checked_at is None else checked_at
+
+    # TCP 可以連線 (帳號錯誤等 HTTP 層的失敗仍視為可連線)
+    @property
+    def reachable(self) -> bool:
+        return self.code not in (INVALID, UNREACHABLE)
+
+
+# 檢查一次: TCP 連線 ip:port, check_auth 時再以 HEAD + Digest auth 確認帳號 (不會建立 EZPro event)
+def probe_ezpro(ezpro: EZProServer, timeout: float = 2.0, check_auth: bool = True) -> HealthResult:
+    if not ezpro.ip or not ezpro.port or not ezpro.username or not ezpro.password:
+        return HealthResult(INVALID)
+    try:
+        socket.create_connection((ezpro.ip, int(ezpro.port)), timeout=timeout).close()
+    except (OSError, ValueError) as e:
+        return HealthResult(UNREACHABLE, f'{e}')
+    if not check_auth:
+        return HealthResult(CONNECTED)
+    try:
+        import requests  # 第一次檢查時才載入
+        from requests.auth import HTTPDigestAuth
+        response = requests.head(f"http://{ezpro.ip}:{ezpro.port}/api/createEvent", auth=HTTPDigestAuth(f"{ezpro.username}", f"{ezpro.password}"), timeout=timeout)
+    except Exception as e:
+        return HealthResult(f"error - {e}")
+    if response.status_code in (401, 403) or response.status_code >= 500:
+        return HealthResult(f'{response}')
+    return HealthResult(CONNECTED)
+
+
+# 在背景定期檢查 EZPro 連線並快取結果 (ttl 秒內有效), GUI 與通報佇列直接讀取, 不會阻塞
+class EZProHealthMonitor:
+
+    def __init__(self, ezpro: EZProServer, interval: float = 30, ttl: float = 90, timeout: float = 2.0, check_auth: bool = True,
+                 on_recover=None, logger: logging.Logger = None) -> None:
+        self.ezpro = ezpro
+        self.interval = interval      # 檢查間隔 (秒)
+        self.ttl = ttl                # 結果的有效時間 (秒), 超過視為未知
+        self.timeout = timeout
+        self.check_auth = check_auth
+        self.on_recover = on_recover  # 由無法連線恢復時呼叫 (例如立即重送 outbox)
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.result = None
+        self.thread = None
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name='ezpro-health', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.check()
+            self.wake_event.wait(self.interval)
+            self.wake_event.clear()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # 立即在背景重新檢查 (例如 EZPro 設定變更後)
+    def request_check(self):
+        self.wake_event.set()
+
+    # 檢查一次 (會阻塞); ezpro 為 None 時檢查目前的設定並更新快取, 否則只檢查指定的設定 (GUI 的連線測試)
+    def check(self, ezpro: EZProServer = None) -> HealthResult:
+        if ezpro is not None:
+            return probe_ezpro(ezpro, self.timeout, self.check_auth)
+        if not self.ezpro.ip:
+            self.result = None  # 尚未設定 EZPro
+            return None
+        try:
+            result = probe_ezpro(self.ezpro, self.timeout, self.check_auth)
+        except Exception as e:
+            result = HealthResult(f'error - {e}')
+        previous = self.result
+        self.result = result
+        if previous is None or previous.code != result.code:
+            if result.code == CONNECTED:
+                self.logger.info(f'ezpro {self.ezpro.ip}:{self.ezpro.port} connected')
+            else:
+                self.logger.error(f'ezpro {self.ezpro.ip}:{self.ezpro.port} check fail: {result.code} {result.detail}')
+        if previous is not None and not previous.reachable and result.reachable and self.on_recover is not None:
+            self.on_recover()
+        return result
+
+    # 快取的結果, 沒有或已過期時回傳 None
+    def status(self, now: float = None):
+        result = self.result
+        now = time.monotonic() if now is None else now
+        if result is None or now - result.checked_at > self.ttl:
+            return None
+        return result
+
+    # 確定無法連線 (快取有效且 TCP 連線失敗)
+    def unreachable(self) -> bool:
+        result = self.status()
+        return result is not None and result.code == UNREACHABLE
@@ -0,0 +1,23 @@
+class CPUInfo:
+    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
+        self.name = name
+        self.usage = usage
+        self.temperature = temperature
+
+class RAMInfo:
+    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
+        self.name = name
+        self.usage = usage
+        self. temperature = temperature
+                    
+class GPUInfo:
+    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
+        self.name = name
+        self.usage = usage
+        self.temperature = temperature
+        
+class DriveInfo:
+    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
+        self.name = name
+        self.usage = usage
+        self.temperature = temperature
@@ -0,0 +1,112 @@
+import argparse
+import logging
+import os
+import signal
+import sys
+import console
+from log_rotation import DailyFileHandler, shared_retention
+from log_writer import shared_writer
+
+# 進入點:
+#   python -m hardwaremonitor            啟動 GUI (同 program.py)
+#   python -m hardwaremonitor --daemon   無 Tk 的背景服務 (systemd)
+
+
+# 程序啟動到現在的秒數 (含直譯器啟動, 精度為 clock tick)
+def process_uptime() -> float:
+    with open('/proc/self/stat') as file:
+        start_ticks = int(file.read().rsplit(')', 1)[1].split()[19])
+    with open('/proc/uptime') as file:
+        uptime = float(file.read().split()[0])
+    return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+
+
+# 設置 MAIN logger (與 GUI 相同的檔案)
+def setup_logger() -> logging.Logger:
+    logger_main = logging.getLogger('MAIN')
+    logger_main.setLevel(logging.INFO)
+    filehandler = DailyFileHandler('main', shared_retention)
+    filehandler.setLevel(logging.INFO)
+    filehandler.setFormatter(logging.Formatter('%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S'))
+    logger_main.addHandler(shared_writer.handler_for(filehandler))
+    return logger_main
+
+
+# 無 Tk 的監控: 取樣、通報、log 都與 GUI 相同, 設定來自 parameters.xml
+def run_daemon(config: str, replay: str = None, profile_startup: bool = False, backend: str = None, verbose: bool = False) -> int:
+    imported_at = process_uptime()
+    console.verbose = verbose  # 每筆樣本的輸出只在 --verbose 時印出
+    from hardwaremonitor_linux import HardwareMonitor_Linux
+    from parameters import ParametersStore, apply_parameters
+    from sampler import ReplaySampler, SAMPLER_BACKENDS
+
+    logger_main = setup_logger()
+    if replay:
+        sampler = ReplaySampler(replay)
+    elif backend:
+        sampler = SAMPLER_BACKENDS[backend]()  # 指定時不使用 parameters.xml 的 Sampler_Backend
+    else:
+        sampler = None
+    monitor = HardwareMonitor_Linux(sampler)
+    parameters = ParametersStore(config, logger=logger_main)
+    if parameters.root is None:
+        logger_main.error(f'read parameters error: {config} not found')
+    else:
+        apply_parameters(parameters.root, monitor, logger_main)
+    parameters.start_watch(lambda root: apply_parameters(root, monitor, logger_main))  # 檔案修改後自動套用
+
+    if profile_startup:
+        # 啟動分析: 處理完第一筆樣本後結束, 輸出各階段時間 (benchmark.py startup 讀取)
+        ready_at = process_uptime()
+        process_sample = monitor.process_sample
+
+        def process_first_sample(sample):
+            process_sample(sample)
+            monitor.isRunning = False
+            print(f'startup interpreter: {imported_at * 1000:.0f} ms', file=sys.stderr)
+            print(f'startup ready: {ready_at * 1000:.0f} ms', file=sys.stderr)
+            print(f'startup first sample: {process_uptime() * 1000:.0f} ms', file=sys.stderr)
+        monitor.process_sample = process_first_sample
+
+    def on_signal(signum, frame):
+        logger_main.info(f'daemon receive signal {signum}, stopping')
+        monitor.isRunning = False
+        monitor.sampler.request_stop()  # tegrastats 也收到 signal 而結束時不重新啟動
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+
+    logger_main.info('daemon start monitoring')
+    monitor.isRunning = True
+    try:
+        monitor.start_monitor()
+    except Exception as e:
+        logger_main.error(f'daemon monitor error: {e}')
+        return 1
+    finally:
+        monitor.stop_monitor()
+        parameters.stop()
+        logger_main.info('daemon stopped')
+        shared_writer.stop()
+    return 0
+
+
+def main():
+    argparser = argparse.ArgumentParser(prog='hardwaremonitor', description='hardware monitor for NVIDIA Jetson')
+    argparser.add_argument('--daemon', action='store_true', help='不啟動 GUI, 以背景服務執行')
+    argparser.add_argument('--config', default='parameters.xml', help='daemon: 參數檔 (與 GUI 相同格式)')
+    argparser.add_argument('--replay', default=None, help='daemon: 重播錄製的 tegrastats log (測試用)')
+    argparser.add_argument('--sampler', choices=['tegrastats', 'sysfs'], default=None, help='daemon: 取樣來源, 預設依 parameters.xml 的 Sampler_Backend (tegrastats)')
+    argparser.add_argument('--verbose', action='store_true', help='daemon: 印出每筆樣本的數值與通報內容 (GUI 一律印出)')
+    argparser.add_argument('--profile-startup', action='store_true', help='daemon: 處理完第一筆樣本後結束並輸出啟動時間')
+    args = argparser.parse_args()
+
+    if args.daemon:
+        sys.exit(run_daemon(args.config, args.replay, args.profile_startup, args.sampler, args.verbose))
+
+    import program
+    program.main()
+
+
+if __name__ == '__main__':
+    main()
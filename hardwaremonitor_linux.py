@@ -1,174 +1,334 @@
-import subprocess  # cpu usage、cpu temperature、ram usage、gpu usage、gpu temperature
-import psutil  # drive usage
-from pySMART import Device  # drive temperature
-from pySMART import DeviceList  # get drive model
-import GPUtil  # gpu model
 import time
-import tkinter 
 import logging
-from ezpronotification import EZProNotification
+import threading
 from ezproserver import EZProServer
-import json
+from tegrastats_parser import TegrastatsSample
+from sampler import Sampler, TegrastatsSampler, SAMPLER_BACKENDS
+from drive_cache import DriveTelemetryCache
+from drive_poller import DrivePoller
+from hardware_info import CPUInfo, RAMInfo, GPUInfo, DriveInfo
+from notification_dispatcher import NotificationDispatcher
+from notification_batcher import NotificationBatcher
+from notification_outbox import NotificationOutbox
+from ezpro_health import EZProHealthMonitor
+from alarm_state import AlarmPolicy
+from alarm_rules import AlarmRuleEngine
+from sample_rate import AdaptiveRate
+from sample_history import SampleHistory
+from rollup import MetricRollups
+from metrics_archive import MetricsArchive
+from metrics_export import MetricsExporter, build_record
+from log_rotation import DailyFileHandler, shared_retention
+from log_writer import shared_writer
+from console import debug_print
+import queue
 
 class HardwareMonitor_Linux():
 
-    def __init__(self) -> None:
+    def __init__(self, sampler: Sampler = None, variable_factory=None) -> None:
         self.setup_logger()
         self.ezpro = EZProServer()
         self.cpu = CPUInfo()
         self.ram = RAMInfo()
         self.gpu = GPUInfo()
         self.drives = {}  # Dictionary 
-        self.process = None
-        self.findRAM = False
-        self.findGR3D_FREQ = False
+        self.drive_cache = DriveTelemetryCache(refresh_interval=300, ttl=900, logger=self.logger_hardwaremonitor)
+        self.drive_poller = DrivePoller(self.drive_cache, self.publish_drives, interval=1, timeout=10, logger=self.logger_hardwaremonitor)
+        self.sampler = sampler or TegrastatsSampler()
+        self.sampler_fixed = sampler is not None  # 建構時指定的 sampler (--replay / --sampler) 優先於 parameters.xml
+        self.pending_sampler = None  # 設定變更的取樣來源, 由監控執行緒切換
+        self.sample = None  # 最新一筆 TegrastatsSample
+        self.history = SampleHistory(capacity=86400)  # 最近 24 小時 @ 1Hz
+        self.rollups = MetricRollups()  # 1min / 15min / 1h 統計
+        self.archive = MetricsArchive('archive', flush_interval=60, logger=self.logger_hardwaremonitor)  # 每天一個二進位檔
+        self.vector_metrics = None  # 每顆核心 / 電源軌的向量指標 (NumPy), 由 record_vectors() 建立
+        self.vector_metrics_disabled = False
+        self.exporter = None  # 結構化定期紀錄 (jsonl / csv), 由 set_export_format() 開啟
+        self.metrics_server = None  # OpenMetrics /metrics, 由 enable_metrics_server() 開啟
+        self.snapshot_queue = None  # GUI 設定後, 每筆樣本放入一份顯示用快照 (queue.Queue)
+        self.adaptive_rate = None  # AdaptiveRate, 由 set_sample_interval(adaptive=True) 開啟
+        self.pending_interval = None  # 設定變更的取樣間隔, 由監控執行緒在取樣之間套用
+        self.pending_export_format = None  # 設定變更的輸出格式 ('' = 關閉), 由監控執行緒套用
+        self.pending_metrics_address = None  # 設定變更的 OpenMetrics (host, port) (() = 關閉), 由監控執行緒套用
         self.isRunning = False
-        self.enableLoggingNotification = tkinter.IntVar()
-        self.enableNotifyToEzPro = tkinter.IntVar()
+        self.monitor_thread = None  # 執行 start_monitor 的執行緒
+        self.loop_stopped = threading.Event()  # 監控迴圈已結束
+        variable_factory = variable_factory or Switch  # GUI 傳入 tkinter.IntVar
+        self.enableLoggingNotification = variable_factory()
+        self.enableNotifyToEzPro = variable_factory()
         self.notification_items = []  # a list of AlarmItem 
         self.logging_period = '10'  # default 10 minute
         self.stopwatch = Stopwatch()
+        self.alarm_policy = AlarmPolicy()
+        self.alarm_rules = AlarmRuleEngine(self.get_alarm_policy, self.submit_notification, self.logger_hardwaremonitor)
+        self.ezpro_health = EZProHealthMonitor(self.ezpro, on_recover=lambda: self.notification_dispatcher.resume_replay(), logger=self.logger_hardwaremonitor)  # 背景檢查 EZPro 連線
+        self.notification_dispatcher = NotificationDispatcher(self.ezpro, self.logger_hardwaremonitor, should_log=lambda: self.enableLoggingNotification.get() == 1,
+                                                              outbox=NotificationOutbox('outbox.db', logger=self.logger_hardwaremonitor),  # EZPro 斷線時的通報存到磁碟
+                                                              health=self.ezpro_health)
+        self.notification_batcher = NotificationBatcher(self.notification_dispatcher.submit, window=0)  # 同一次 tick 的通報合併送出
 
     # 設置 logger
     def setup_logger(self):
         try:
             self.logger_hardwaremonitor = logging.getLogger('HARDWAREMONITOR')
             self.logger_hardwaremonitor.setLevel(logging.INFO)
-            self.filehandler = logging.FileHandler(f'hardwaremonitor_{time.strftime("%Y%m%d")}.log')
+            self.filehandler = DailyFileHandler('hardwaremonitor', shared_retention)  # 每天 00:00 換檔, 舊檔壓縮 / 清理
             self.filehandler.setLevel(logging.INFO)
             self.formatter = logging.Formatter('%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
             self.filehandler.setFormatter(self.formatter)
-            self.logger_hardwaremonitor.addHandler(self.filehandler)
+            self.queuehandler = shared_writer.handler_for(self.filehandler)  # 由背景執行緒累積後寫入
+            self.logger_hardwaremonitor.addHandler(self.queuehandler)
             print('setup logger_hardwaremonitor success')
         except Exception as e:
             print(f'setup logger_hardwaremonitor error: {e}')
 
     # 開始監控
     def start_monitor(self):
+        self.drive_cache.is_smartmontools_installed()
+        self.drive_poller.start()
+        self.notification_dispatcher.start()
+        self.ezpro_health.start()
         self.stopwatch.start()
-        while True and self.isRunning:
-            if self.process is None:
-                self.process = subprocess.Popen(['tegrastats'], stdout=subprocess.PIPE, text=True)
-            output_line = self.process.stdout.readline()
-            hardwareInfos = output_line.split(' ')
-
-            for info in hardwareInfos:
-                if "RAM" in info:
-                    self.findRAM = True
-                    continue
-
-                if "/" in info and "MB" in info and self.findRAM:
-                    self.findRAM = False
-                    ramArr = info.replace("MB", "").split("/")
-                    self.ram.usage = round(float(ramArr[0]) * 100 / float(ramArr[1]), 1)
-                    print(f"RAM: {self.ram.usage}%")
-
-                if "[" in info and "]" in info:
-                    arrCPUs = info.replace("[", "").replace("]", "").split(",")
-                    total = 0
-                    for core in arrCPUs:
-                        total += int(core.split("%@")[0])
-                    self.cpu.usage = round(total / len(arrCPUs), 1)
-                    print(f"CPU: {self.cpu.usage}%")
-
-                if "CPU@" in info:
-                    self.cpu.temperature = int(float(info.split("@")[1].replace("C","")))
-                    print(f"CPU_Temperature: {self.cpu.temperature}C")
-
-                if "GR3D_FREQ" in info:
-                    self.findGR3D_FREQ = True
-
-                if "%@" in info and self.findGR3D_FREQ:
-                    self.findGR3D_FREQ = False
-                    arrGPU = info.split("%@")
-                    self.gpu.usage = round(float(arrGPU[0]), 1)
-                    print(f"GPU: {self.gpu.usage}%")
-
-                if "GPU@" in info and "C" in info:
-                    arr = info.split("@")
-                    self.gpu.temperature = int(float(arr[1].replace("C", "")))
-                    print(f"GPU_Temperature: {self.gpu.temperature}C")
-
-            self.get_drives_info()
-
-            self.stopwatch.stop()
-            # print(f'{self.stopwatch.elapsed_time}')
-            if self.stopwatch.elapsed_time > int(self.logging_period)*60:
-                self.stopwatch.reset()
-                self.stopwatch.start()
-                dreiveInfo_string = ""
-                for drive in self.drives:
-                    driveInfo = self.drives[drive]
-                    dreiveInfo_string += f"{driveInfo.name} usage: {driveInfo.usage}, temperature: {driveInfo.temperature}" 
-                message = f"cpu usage:{self.cpu.usage}, cpu temperature:{self.cpu.temperature}; ram usage:{self.ram.usage}; gpu usage:{self.gpu.usage}, gpu temperature:{self.gpu.temperature}; {dreiveInfo_string}"
-                self.logger_hardwaremonitor.info(message)
-                # print(message)
-            else:
-                self.stopwatch.start()
-
-            if self.enableNotifyToEzPro.get() == 1:
-                self.send_notification()
-
-            time.sleep(1)
+        self.apply_pending_sampler()
+        self.apply_pending_interval()
+        self.apply_pending_outputs()
+        self.monitor_thread = threading.current_thread()
+        self.loop_stopped.clear()
+        try:
+            self.sampler.start()
+            while True and self.isRunning:
+                sample = self.sampler.read()
+                if self.sampler.exhausted:  # 重播結束或已呼叫 stop(); tegrastats 意外結束時由 sampler 重新啟動
+                    self.logger_hardwaremonitor.info(f'{type(self.sampler).__name__} finished, stop monitoring')
+                    break
+                self.process_sample(sample)
+
+                # 取樣時間由 sampler 決定 (tegrastats --interval / monotonic deadline), 這裡不另外等待
+                self.apply_pending_sampler()
+                self.apply_pending_interval()
+                self.apply_pending_outputs()
+                adaptive_rate = self.adaptive_rate
+                if adaptive_rate is not None:
+                    interval = adaptive_rate.next_interval(self, self.alarm_rules.near, time.monotonic())
+                    if interval != self.sampler.interval:
+                        self.logger_hardwaremonitor.info(f'sample interval {self.sampler.interval}s -> {interval}s')
+                        self.sampler.set_interval(interval)
+        except Exception as e:
+            self.logger_hardwaremonitor.error(f'monitor stopped: {e}')  # 例如 tegrastats 無法重新啟動, daemon 以非 0 結束
+            raise
+        finally:
+            self.loop_stopped.set()
+
+    # 切換到設定的取樣來源 (只在監控執行緒呼叫)
+    def apply_pending_sampler(self):
+        sampler = self.pending_sampler
+        if sampler is not None:
+            self.pending_sampler = None
+            self.sampler.stop()
+            self.sampler = sampler
+            self.logger_hardwaremonitor.info(f'sampler backend -> {type(sampler).__name__}')
+
+    # 套用設定變更的取樣間隔 (只在監控執行緒呼叫: 重新啟動 tegrastats 時不會有其他執行緒正在 readline())
+    def apply_pending_interval(self):
+        interval = self.pending_interval
+        if interval is not None:
+            self.pending_interval = None
+            self.sampler.set_interval(interval)
+
+    # 套用設定變更的結構化輸出 / OpenMetrics (只在監控執行緒呼叫: process_sample 不會寫入已關閉的輸出)
+    def apply_pending_outputs(self):
+        format = self.pending_export_format
+        if format is not None:
+            self.pending_export_format = None
+            if self.exporter is None or self.exporter.format != format:
+                if self.exporter is not None:
+                    self.exporter.close()
+                    self.exporter = None
+                if format:
+                    # 定期紀錄每 logging_period (10 ~ 60 分鐘) 才一筆, 每筆立即寫入: 當機 / 斷電不會遺失已完成的紀錄
+                    self.exporter = MetricsExporter('.', format, batch_size=1, logger=self.logger_hardwaremonitor)
+        address = self.pending_metrics_address
+        if address is not None:
+            self.pending_metrics_address = None
+            metrics_server = self.metrics_server
+            if metrics_server is not None and metrics_server.server is not None and (metrics_server.host, metrics_server.port) == address:
+                return  # 設定沒有變更 (重新載入參數時)
+            if metrics_server is not None:
+                metrics_server.stop()
+                self.metrics_server = None
+            if address:
+                from metrics_http import MetricsHTTPServer  # http.server 只在開啟時載入
+                self.metrics_server = MetricsHTTPServer(*address, self.logger_hardwaremonitor)
+                self.metrics_server.start()
+
+    # 處理一筆樣本: 更新資訊、定期寫入 log、通報
+    def process_sample(self, sample: TegrastatsSample):
+        if sample is not None:
+            self.update_hardware_info(sample)
+        timestamp = time.time()
+        self.history.record(timestamp, self)
+        self.rollups.record(timestamp, self)
+        self.archive.append(timestamp, self)
+        if sample is not None:
+            self.record_vectors(timestamp, sample)
+
+        self.stopwatch.stop()
+        # print(f'{self.stopwatch.elapsed_time}')
+        if self.stopwatch.elapsed_time > int(self.logging_period)*60:
+            self.stopwatch.reset()
+            self.stopwatch.start()
+            summary = self.rollups.take_period_summary()  # 這段期間的 min/avg/max/p95, 不會漏掉期間內的尖峰
+            vector_summary = self.vector_metrics.take_period_summary() if self.vector_metrics is not None else {}
+            dreiveInfo_string = ""
+            for drive in self.drives:
+                driveInfo = self.drives[drive]
+                dreiveInfo_string += f"{driveInfo.name} usage: {driveInfo.usage} {format_summary(summary, f'drive.{driveInfo.name}.usage')}, temperature: {driveInfo.temperature} {format_summary(summary, f'drive.{driveInfo.name}.temperature')}; " 
+            message = (f"cpu usage:{self.cpu.usage} {format_summary(summary, 'cpu.usage')}, cpu temperature:{self.cpu.temperature} {format_summary(summary, 'cpu.temperature')}; "
+                       f"ram usage:{self.ram.usage} {format_summary(summary, 'ram.usage')}; "
+                       f"gpu usage:{self.gpu.usage} {format_summary(summary, 'gpu.usage')}, gpu temperature:{self.gpu.temperature} {format_summary(summary, 'gpu.temperature')}; {dreiveInfo_string}")
+            if vector_summary:
+                message += format_vector_summary(vector_summary)
+            self.logger_hardwaremonitor.info(message)
+            if self.exporter is not None:
+                self.exporter.write(build_record(timestamp, self, summary, vector_summary))
+            # print(message)
+        else:
+            self.stopwatch.start()
+
+        self.send_notification()  # 每筆樣本都評估規則 (adaptive 取樣 / alarm 狀態), 是否送出由 submit_notification 決定
+
+        if self.metrics_server is not None:
+            self.metrics_server.publish(self.metrics_server.render(self, timestamp))
+
+        if self.snapshot_queue is not None:
+            self.publish_snapshot()
+
+    # 記錄每顆核心 / 電源軌的向量 (第一次有樣本時才載入 NumPy, 沒有安裝時停用)
+    def record_vectors(self, timestamp: float, sample: TegrastatsSample):
+        if self.vector_metrics is None:
+            if self.vector_metrics_disabled:
+                return
+            try:
+                from vector_metrics import VectorMetrics
+                self.vector_metrics = VectorMetrics()
+            except ImportError as e:
+                self.vector_metrics_disabled = True
+                self.logger_hardwaremonitor.error(f"per-core / power metrics disabled: {e}")
+                return
+        try:
+            self.vector_metrics.record(timestamp, sample)
+        except Exception as e:
+            self.logger_hardwaremonitor.error(f"record vector metrics error: {e}")
+
+    # 以 tegrastats 樣本更新 cpu / ram / gpu 資訊
+    def update_hardware_info(self, sample: TegrastatsSample):
+        self.sample = sample
+        if sample.ram_total > 0:
+            self.ram.usage = sample.ram_usage
+            debug_print(f"RAM: {self.ram.usage}%")
+        if len(sample.cpu_loads) > 0:
+            self.cpu.usage = sample.cpu_usage
+            debug_print(f"CPU: {self.cpu.usage}%")
+        cpu_temperature = sample.cpu_temperature
+        if cpu_temperature is not None:
+            self.cpu.temperature = int(cpu_temperature)
+            debug_print(f"CPU_Temperature: {self.cpu.temperature}C")
+        self.gpu.usage = sample.gpu_usage
+        debug_print(f"GPU: {self.gpu.usage}%")
+        gpu_temperature = sample.gpu_temperature
+        if gpu_temperature is not None:
+            self.gpu.temperature = int(gpu_temperature)
+            debug_print(f"GPU_Temperature: {self.gpu.temperature}C")
 
     # 停止監控
     def stop_monitor(self):
         self.isRunning = False
-        if self.process is not None:
-            self.process.terminate()
-            self.process.wait()
+        # 由其他執行緒 (Tk) 呼叫時, 先等監控迴圈結束再關閉封存 / 匯出, 避免 process_sample 在關閉後又寫入
+        if self.monitor_thread is not None and self.monitor_thread is not threading.current_thread():
+            if not self.loop_stopped.wait(self.sampler.interval + 1):
+                self.sampler.stop()  # 結束等待中的讀取
+                self.loop_stopped.wait(5)
+        self.sampler.stop()
+        self.drive_poller.stop()
+        self.notification_batcher.flush()
+        self.notification_dispatcher.stop()
+        self.ezpro_health.stop()
+        self.archive.close()
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        shared_writer.sync()  # 寫入尚未寫入的 log
+
+    # 設定取樣來源: 'tegrastats' (預設) / 'sysfs' (直接讀取 procfs / sysfs, 不需要 tegrastats)
+    def set_sampler_backend(self, backend: str):
+        if backend not in SAMPLER_BACKENDS:
+            raise ValueError(f'unknown sampler backend {backend}')
+        sampler_class = SAMPLER_BACKENDS[backend]
+        pending = self.pending_sampler
+        if self.sampler_fixed or type(pending or self.sampler) is sampler_class:
+            return
+        self.pending_sampler = sampler_class(interval=self.sampler.interval)
+
+    # 設定取樣間隔 (秒); adaptive: 接近門檻時加快、閒置時放慢
+    def set_sample_interval(self, interval: float, adaptive: bool = False):
+        if adaptive and self.adaptive_rate is not None and self.adaptive_rate.interval == interval:
+            return  # 設定沒有變更, 保留目前的 adaptive 狀態
+        self.pending_interval = interval  # 可能由 GUI / parameters-watch 執行緒呼叫, 實際變更交給監控執行緒
+        self.adaptive_rate = AdaptiveRate(interval) if adaptive else None
+
+    # 設定定期紀錄的結構化輸出格式 ('jsonl' / 'csv'), None 表示只寫入 log; 實際變更交給監控執行緒
+    def set_export_format(self, format: str):
+        self.pending_export_format = format or ''
+
+    # 顯示用快照: {row key: (type, usage, temperature)}, 佇列滿時丟掉最舊的 (GUI 只需要最新的)
+    def publish_snapshot(self):
+        snapshot = {
+            'CPU': ('CPU', f"{self.cpu.usage}%", f"{self.cpu.temperature}C"),
+            'RAM': ('RAM', f"{self.ram.usage}%", "-"),
+            'GPU': ('GPU', f"{self.gpu.usage}%", f"{self.gpu.temperature}C"),
+        }
+        for driveInfo in self.drives.values():
+            snapshot[driveInfo.name] = (f'{driveInfo.name}', f"{driveInfo.usage}%", f"{driveInfo.temperature}C")
+        while True:
+            try:
+                self.snapshot_queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.snapshot_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    # 開啟 OpenMetrics HTTP endpoint (http://host:port/metrics); 實際變更交給監控執行緒
+    def enable_metrics_server(self, port: int, host: str = '0.0.0.0'):
+        self.pending_metrics_address = (host, port)
+
+    # 關閉 OpenMetrics HTTP endpoint
+    def disable_metrics_server(self):
+        self.pending_metrics_address = ()
 
     # 取得所有硬碟 (初始化用)
     def get_devices(self) -> list:
+        import psutil  # drive usage
         return psutil.disk_partitions()
 
-    # 取得硬碟資訊(名稱、使用量、溫度)
+    # 取得硬碟資訊(名稱、使用量、溫度), 平常由 drive_poller 在背景執行
     def get_drives_info(self):
-        try:
-
-            partitions = psutil.disk_partitions()
-
-            for partition in partitions:
-
-                if 'cdrom' in partition.opts or partition.fstype == '':
-                    continue
-
-                usage = psutil.disk_usage(partition.mountpoint)
-                print(f"drive({partition.device}) usage: {round(usage.percent)}%")
-
-                temperature = 0
-
-                if not self.is_smartmontools_installed():
-                    print("Please install smartmontools to proceed.")
-                else:
-                    temperature = self.get_specific_device_temperature(partition.device) or 0         
+        self.drive_poller.poll()
 
-                # create/update value
-                self.drives[partition.device] = DriveInfo(partition.device, round(usage.percent, 1), temperature)  
+    # 發佈硬碟資訊 (整個 dict 替換, 讀取端不會看到更新到一半的資料)
+    def publish_drives(self, drives: dict):
+        self.drives = drives
 
-        except Exception as e:
-            self.logger_hardwaremonitor.error(f'get drives info error: {e}')
-
-    # 檢查是否安裝 smartmontools
+    # 檢查是否安裝 smartmontools (結果已快取)
     def is_smartmontools_installed(self):
-        try:
-            subprocess.run(['smartctl', '--version'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            return True
-        except subprocess.CalledProcessError:
-            self.logger_hardwaremonitor.error("smartctl is installed but there was a problem running it.")
-            return False
-        except FileNotFoundError:
-            self.logger_hardwaremonitor.error("smartmontools is not installed.")
-            return False
+        return self.drive_cache.is_smartmontools_installed()
         
-    # 取得硬碟溫度 by using pySMART    
+    # 取得硬碟溫度 by using smartctl (依 drive_cache.refresh_interval 快取)
     def get_specific_device_temperature(self, device_name: str) -> int:
-        try:
-            return Device(device_name).temperature
-        except Exception as e:
-            print(f'get device temperature error: {e}')
-            self.logger_hardwaremonitor.error(f'get device temperature error: {e}')
-            return 0 
+        return self.drive_cache.get_temperature(device_name)
         
     # 取得 cpu model 
     def get_cpu_model(self) -> str:
@@ -184,6 +344,7 @@ class HardwareMonitor_Linux():
     # 取得 gpu model
     def get_gpus_model(self) -> list:
         try:
+            import GPUtil  # gpu model (只用於一次性的型號查詢, 需要時才載入)
             gpus = GPUtil.getGPUs()
             return [gpu.name for gpu in gpus]
         except Exception as e:
@@ -193,123 +354,77 @@ class HardwareMonitor_Linux():
     # 取得 drive model
     def get_drives_model(self) -> list:
         try:
+            from pySMART import DeviceList  # get drive model
             drives = DeviceList()
             return [drive.model for drive in drives]
         except Exception as e:
             self.logger_hardwaremonitor.error(f"get drive model error: {e}")
             return []
 
-    # 通報 EZPro
+    # 通報項目的條件, 未設定的欄位使用 alarm_policy
+    def get_alarm_policy(self, item: 'AlarmItem') -> AlarmPolicy:
+        policy = self.alarm_policy
+        return AlarmPolicy(
+            float(item.hold_time) if item.hold_time is not None else policy.hold_time,
+            float(item.hysteresis) if item.hysteresis is not None else policy.hysteresis,
+            float(item.cooldown) if item.cooldown is not None else policy.cooldown,
+            float(item.reminder_interval) if item.reminder_interval is not None else policy.reminder_interval,
+            policy.notify_resolve)
+
+    # 通報 EZPro (規則只在 notification_items 變更時重新編譯)
     def send_notification(self):
         try:
-            if (len(self.notification_items) > 0):
-                for item in self.notification_items:
-                        if item.name == 'CPU' and item.target == 'Usage':
-                            if self.cpu.usage >= int(item.threshold):
-                                ezpro_notification = EZProNotification(f"CPU usage: {self.cpu.usage}%")
-                                ezpro_notification_json = json.dumps(ezpro_notification.__dict__)
-                                response = EZProNotification.send_notification(self.ezpro, ezpro_notification_json)
-                                if self.enableLoggingNotification.get() == 1:
-                                    if response is not None and response.status_code == 200:
-                                        self.logger_hardwaremonitor.info(f"send notification sucess: {ezpro_notification_json}")
-                                    else:
-                                        self.logger_hardwaremonitor.error(f"send notification fail: {response}, notification content: {ezpro_notification_json}")
-                        elif item.name == 'CPU' and item.target == 'Temperature':
-                            if self.cpu.temperature >= int(item.threshold):
-                                ezpro_notification = EZProNotification(f"CPU temperature: {self.cpu.temperature}%")
-                                ezpro_notification_json = json.dumps(ezpro_notification.__dict__)
-                                response = EZProNotification.send_notification(self.ezpro, ezpro_notification_json)
-                                if self.enableLoggingNotification.get() == 1:
-                                    if response is not None and response.status_code == 200:
-                                        self.logger_hardwaremonitor.info(f"send notification sucess: {ezpro_notification_json}")
-                                    else:
-                                        self.logger_hardwaremonitor.error(f"send notification fail: {response}, notification content: {ezpro_notification_json}")
-                        elif item.name == 'RAM':
-                            if self.ram.usage >= int(item.threshold):
-                                ezpro_notification = EZProNotification(f"RAM usage: {self.ram.usage}%")
-                                ezpro_notification_json = json.dumps(ezpro_notification.__dict__)
-                                response = EZProNotification.send_notification(self.ezpro, ezpro_notification_json)
-                                if self.enableLoggingNotification.get() == 1:
-                                    if response is not None and response.status_code == 200:
-                                        self.logger_hardwaremonitor.info(f"send notification sucess: {ezpro_notification_json}")
-                                    else:
-                                        self.logger_hardwaremonitor.error(f"send notification fail: {response}, notification content: {ezpro_notification_json}") 
-                        elif item.name == 'GPU' and item.target == 'Usage':
-                            if self.gpu.usage >= int(item.threshold):
-                                ezpro_notification = EZProNotification(f"GPU usage: {self.gpu.usage}%")
-                                ezpro_notification_json = json.dumps(ezpro_notification.__dict__)
-                                response = EZProNotification.send_notification(self.ezpro, ezpro_notification_json)
-                                if self.enableLoggingNotification.get() == 1:
-                                    if response is not None and response.status_code == 200:
-                                        self.logger_hardwaremonitor.info(f"send notification sucess: {ezpro_notification_json}")
-                                    else:
-                                        self.logger_hardwaremonitor.error(f"send notification fail: {response}, notification content: {ezpro_notification_json}") 
-                        elif item.name == 'GPU' and item.target == 'Temperature':
-                            if self.gpu.temperature >= int(item.threshold):
-                                ezpro_notification = EZProNotification(f"GPU temperature: {self.gpu.temperature}%")
-                                ezpro_notification_json = json.dumps(ezpro_notification.__dict__)
-                                response = EZProNotification.send_notification(self.ezpro, ezpro_notification_json)
-                                if self.enableLoggingNotification.get() == 1:
-                                    if response is not None and response.status_code == 200:
-                                        self.logger_hardwaremonitor.info(f"send notification sucess: {ezpro_notification_json}")
-                                    else:
-                                        self.logger_hardwaremonitor.error(f"send notification fail: {response}, notification content: {ezpro_notification_json}")
-                        elif item.name == 'Drive' and item.target == 'Usage':
-                             for drive in self.drives:
-                                driveInfo = self.drives[drive]
-                                if driveInfo.usage >= int(item.threshold):
-                                    ezpro_notification = EZProNotification(f"{driveInfo.name} usage: {driveInfo.usage}%")
-                                    ezpro_notification_json = json.dumps(ezpro_notification.__dict__)
-                                    response = EZProNotification.send_notification(self.ezpro, ezpro_notification_json)
-                                    if self.enableLoggingNotification.get() == 1:
-                                        if response is not None and response.status_code == 200:
-                                            self.logger_hardwaremonitor.info(f"send notification sucess: {ezpro_notification_json}")
-                                        else:
-                                            self.logger_hardwaremonitor.error(f"send notification fail: {response}, notification content: {ezpro_notification_json}")
-                        elif item.name == 'Drive' and item.target == 'Temperature':
-                            for drive in self.drives:
-                                driveInfo = self.drives[drive]
-                                if driveInfo.temperature >= int(item.threshold):
-                                    ezpro_notification = EZProNotification(f"{driveInfo.name} temperature: {driveInfo.temperature}%")
-                                    ezpro_notification_json = json.dumps(ezpro_notification.__dict__)
-                                    response = EZProNotification.send_notification(self.ezpro, ezpro_notification_json)
-                                    if self.enableLoggingNotification.get() == 1:
-                                        if response is not None and response.status_code == 200:
-                                            self.logger_hardwaremonitor.info(f"send notification sucess: {ezpro_notification_json}")
-                                        else:
-                                            self.logger_hardwaremonitor.error(f"send notification fail: {response}, notification content: {ezpro_notification_json}")
+            self.alarm_rules.evaluate(self, self.notification_items)
+            self.notification_batcher.tick()
         except Exception as e:
             self.logger_hardwaremonitor.error(f"send notification fail -> {e}")
 
-class CPUInfo:
-    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
-        self.name = name
-        self.usage = usage
-        self.temperature = temperature
-
-class RAMInfo:
-    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
-        self.name = name
-        self.usage = usage
-        self. temperature = temperature
-                    
-class GPUInfo:
-    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
-        self.name = name
-        self.usage = usage
-        self.temperature = temperature
-        
-class DriveInfo:
-    def __init__(self, name = "", usage = 0, temperature = 0) -> None:
-        self.name = name
-        self.usage = usage
-        self.temperature = temperature
+    # 規則引擎的事件: 開啟 EZPro 通報時才送出
+    def submit_notification(self, description: str):
+        if self.enableNotifyToEzPro.get() == 1:
+            self.notification_batcher.add(description)
+
+# 定期 log 的統計字串: (min/avg/max/p95 ...)
+def format_summary(summary: dict, name: str) -> str:
+    values = summary.get(name)
+    if values is None:
+        return "(min/avg/max/p95 -)"
+    return f"(min/avg/max/p95 {values[0]:g}/{values[1]:g}/{values[2]:g}/{values[3]:g})"
+
+# 定期 log 的核心 / 電源軌統計: 使用率最高的核心, 每個電源軌的平均功率與期間能量
+def format_vector_summary(vector_summary: dict) -> str:
+    cores = [(name, values) for name, values in vector_summary.items() if name.startswith('cpu.') and name.endswith('.usage')]
+    message = ""
+    if cores:
+        name, values = max(cores, key=lambda core: core[1]['max'])
+        message += f"busiest core: {name.split('.')[1]} (avg/max/stdev {values['avg']:g}/{values['max']:g}/{values['stdev']:g}); "
+    for name, values in vector_summary.items():
+        if name.startswith('power.'):
+            message += f"{name[len('power.'):]} power (avg/max {values['avg']:g}/{values['max']:g}mW), energy: {values['energy']:g}J; "
+    return message
+
+# 取代 tkinter.IntVar 的開關 (無 Tk 環境使用)
+class Switch:
+    def __init__(self, value = 0) -> None:
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
 
 class AlarmItem:
-    def __init__(self, name="", target="", threshold=0) -> None:
+    def __init__(self, name="", target="", threshold=0, hold_time=None, hysteresis=None, cooldown=None, reminder_interval=None, operator=None) -> None:
         self.name = name
         self.target = target
         self.threshold = threshold
+        self.operator = operator  # '>=' (預設), '>', '<=', '<', 'rate>=', 'rate<='
+        # 以下為 None 時使用 HardwareMonitor_Linux.alarm_policy 的設定
+        self.hold_time = hold_time
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.reminder_interval = reminder_interval
 
 class Stopwatch:
     def __init__(self):
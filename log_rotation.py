@@ -0,0 +1,178 @@
+import os
+import re
+import gzip
+import shutil
+import time
+import threading
+import logging
+
+# 需要輪替 / 壓縮 / 清理的檔案: {prefix}_YYYYMMDD.{log,jsonl,csv}[.gz]
+LOG_FILE_PATTERN = re.compile(r'^(?P<prefix>hardwaremonitor|main)_(?P<date>\d{8})(?:_\d+)?\.(?P<extension>log|jsonl|csv)(?P<compressed>\.gz)?$')  # _1: 欄位不同的同日 CSV
+
+
+# 下一個本地時間 00:00 (epoch)
+def next_midnight(now: float) -> float:
+    tomorrow = time.localtime(now + 86400)
+    return time.mktime(tomorrow[:3] + (0, 0, 0, 0, 0, -1))
+
+
+# 關閉後的檔案壓縮與保留策略 (所有 logger 共用一個背景執行緒)
+class LogRetention:
+
+    def __init__(self, directory: str = '.', max_age_days: int = 30, max_total_bytes: int = 512 * 1024 * 1024, compress: bool = True) -> None:
+        self.directory = directory
+        self.max_age_days = max_age_days        # 超過幾天的檔案刪除
+        self.max_total_bytes = max_total_bytes  # 所有檔案總大小上限, 超過時由最舊的開始刪除
+        self.compress = compress
+        self.active_paths = set()  # 正在寫入的檔案, 不壓縮也不刪除
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    # 登記 / 更換正在寫入的檔案
+    def set_active(self, old_path: str, new_path: str):
+        with self.lock:
+            self.active_paths.discard(old_path and os.path.abspath(old_path))
+            if new_path:
+                self.active_paths.add(os.path.abspath(new_path))
+
+    # 要求背景執行緒整理 (檔案輪替時、啟動時)
+    def request_sweep(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='log-retention', daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f'log retention error: {e}')
+
+    # 壓縮已關閉的檔案, 再依保存天數 / 總大小刪除舊檔
+    def sweep(self, now: float = None):
+        now = time.time() if now is None else now
+        today = time.strftime('%Y%m%d', time.localtime(now))
+        oldest = time.strftime('%Y%m%d', time.localtime(now - self.max_age_days * 86400))
+        with self.lock:
+            active_paths = set(self.active_paths)
+        files = []
+        for name in os.listdir(self.directory):
+            match = LOG_FILE_PATTERN.match(name)
+            if match is None:
+                continue
+            path = os.path.abspath(os.path.join(self.directory, name))
+            if path in active_paths or match['date'] >= today:
+                continue
+            if match['date'] < oldest:
+                self.remove(path)
+                continue
+            if self.compress and not match['compressed']:
+                path = self.compress_file(path)
+                if path is None:
+                    continue
+            if path not in files:
+                files.append(path)
+        total = 0
+        sizes = []
+        for path in files:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            total += size
+            sizes.append((LOG_FILE_PATTERN.match(os.path.basename(path))['date'], path, size))
+        for date, path, size in sorted(sizes):
+            if total <= self.max_total_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    # gzip 壓縮後刪除原檔; 已有 .gz (例如跨日後才寫入的資料) 時附加為新的 gzip member
+    def compress_file(self, path: str) -> str:
+        compressed_path = path + '.gz'
+        try:
+            with open(path, 'rb') as source, gzip.open(compressed_path, 'ab') as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            os.remove(path)
+            return compressed_path
+        except Exception as e:
+            print(f'compress log file {path} error: {e}')
+            return None
+
+    def remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f'remove log file {path} error: {e}')
+
+
+# 每天 00:00 換檔的 FileHandler, 檔名為 {prefix}_YYYYMMDD.log
+class DailyFileHandler(logging.FileHandler):
+
+    def __init__(self, prefix: str, retention: LogRetention = None, directory: str = '.', encoding: str = None) -> None:
+        self.prefix = prefix
+        self.directory = directory
+        self.retention = retention
+        now = time.time()
+        self.rollover_at = next_midnight(now)
+        super().__init__(self.path_for(now), encoding=encoding)
+        if retention is not None:
+            retention.set_active(None, self.baseFilename)
+            retention.request_sweep()  # 清理上次執行留下的檔案
+
+    def path_for(self, timestamp: float) -> str:
+        return os.path.join(self.directory, f'{self.prefix}_{time.strftime("%Y%m%d", time.localtime(timestamp))}.log')
+
+    def emit(self, record: logging.LogRecord):
+        if record.created >= self.rollover_at:
+            self.rollover(record.created)
+        super().emit(record)
+
+    # 一次寫入多筆已格式化的紀錄 [(created, text)], 跨過 00:00 時先寫完舊檔再換檔
+    def write_batch(self, entries: list):
+        self.acquire()
+        try:
+            chunk = []
+            for created, text in entries:
+                if created >= self.rollover_at:
+                    self.write_chunk(chunk)
+                    chunk = []
+                    self.rollover(created)
+                chunk.append(text)
+                chunk.append(self.terminator)
+            self.write_chunk(chunk)
+        finally:
+            self.release()
+
+    def write_chunk(self, chunk: list):
+        if not chunk:
+            return
+        if self.stream is None:
+            self.stream = self._open()
+        self.stream.write(''.join(chunk))
+        self.stream.flush()
+
+    def rollover(self, now: float):
+        old_path = self.baseFilename
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        self.baseFilename = os.path.abspath(self.path_for(now))
+        self.rollover_at = next_midnight(now)
+        if self.retention is not None:
+            self.retention.set_active(old_path, self.baseFilename)
+            self.retention.request_sweep()
+
+    def close(self):
+        if self.retention is not None:
+            self.retention.set_active(self.baseFilename, None)
+        super().close()
+
+
+# HARDWAREMONITOR 與 MAIN logger 共用的保留策略
+shared_retention = LogRetention()
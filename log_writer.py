@@ -0,0 +1,121 @@
+import time
+import queue
+import atexit
+import threading
+import logging
+from logging.handlers import QueueHandler
+
+
+# 放入 writer 佇列的 handler, 記錄要寫到哪個 handler
+class WriteBehindHandler(QueueHandler):
+
+    def __init__(self, writer: 'WriteBehindWriter', target: logging.Handler) -> None:
+        super().__init__(writer.queue)
+        self.writer = writer
+        self.target = target
+
+    def enqueue(self, record: logging.LogRecord):
+        self.queue.put_nowait((self.target, record))
+
+
+# 延後寫入的 log writer: 所有 logger 共用一個執行緒, 累積後一次寫入, 減少 SD 卡 / eMMC 的小量寫入
+class WriteBehindWriter:
+
+    def __init__(self, flush_interval: float = 30, max_buffer: int = 64 * 1024, flush_level: int = logging.ERROR) -> None:
+        self.flush_interval = flush_interval  # 最多累積幾秒
+        self.max_buffer = max_buffer          # 累積超過幾 bytes 立即寫入
+        self.flush_level = flush_level        # 此等級以上的紀錄立即寫入
+        self.queue = queue.SimpleQueue()
+        self.pending = {}  # {target handler: [(created, text)]}
+        self.buffered = 0
+        self.urgent = False
+        self.next_flush = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    # 取得寫入 target 的 QueueHandler (第一次呼叫時啟動執行緒)
+    def handler_for(self, target: logging.Handler) -> WriteBehindHandler:
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='log-writer', daemon=True)
+                self.thread.start()
+                atexit.register(self.stop)
+        return WriteBehindHandler(self, target)
+
+    def run(self):
+        while True:
+            timeout = max(self.next_flush - time.monotonic(), 0) if self.next_flush is not None else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                self.flush()
+                break
+            if isinstance(item, threading.Event):
+                self.flush()
+                item.set()
+                continue
+            if item:
+                self.add(*item)
+            self.maybe_flush(time.monotonic())
+
+    # 格式化並累積一筆紀錄
+    def add(self, target: logging.Handler, record: logging.LogRecord, now: float = None):
+        if record.levelno < target.level or not target.filter(record):
+            return
+        try:
+            text = target.format(record)
+        except Exception:
+            target.handleError(record)
+            return
+        self.pending.setdefault(target, []).append((record.created, text))
+        self.buffered += len(text) + 1
+        if record.levelno >= self.flush_level:
+            self.urgent = True
+        if self.next_flush is None:
+            self.next_flush = (time.monotonic() if now is None else now) + self.flush_interval
+
+    def maybe_flush(self, now: float):
+        if self.urgent or self.buffered >= self.max_buffer or (self.next_flush is not None and now >= self.next_flush):
+            self.flush()
+
+    # 每個 target 一次寫入
+    def flush(self):
+        pending = self.pending
+        self.pending = {}
+        self.buffered = 0
+        self.urgent = False
+        self.next_flush = None
+        for target, entries in pending.items():
+            try:
+                if hasattr(target, 'write_batch'):
+                    target.write_batch(entries)
+                else:
+                    target.acquire()
+                    try:
+                        target.stream.write(''.join(text + target.terminator for created, text in entries))
+                        target.flush()
+                    finally:
+                        target.release()
+            except Exception as e:
+                print(f'log writer flush error: {e}')
+
+    # 等待目前佇列中的紀錄寫入完成
+    def sync(self, timeout: float = 5):
+        if self.thread is None or not self.thread.is_alive():
+            self.flush()
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    # 結束前寫入所有紀錄
+    def stop(self, timeout: float = 5):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+
+# HARDWAREMONITOR 與 MAIN logger 共用的 writer
+shared_writer = WriteBehindWriter()
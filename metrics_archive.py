@@ -0,0 +1,233 @@
+import os
+import re
+import mmap
+import math
+import time
+import struct
+import zlib
+import logging
+
+# 檔頭: magic, 版本, 每筆長度, 硬碟數量, 硬碟名稱 (每個 32 bytes), 補齊到 HEADER_SIZE
+HEADER = struct.Struct('<4sHHI')
+HEADER_SIZE = 256
+MAGIC = b'HWMA'
+VERSION = 1
+DRIVE_SLOTS = 4
+DRIVE_NAME_SIZE = 32
+
+# 每筆紀錄: timestamp, cpu usage/temperature, ram usage, gpu usage/temperature, swap usage, 硬碟 usage/temperature x DRIVE_SLOTS, crc32
+RECORD = struct.Struct(f'<d6f{DRIVE_SLOTS * 2}fI')
+RECORD_PAYLOAD_SIZE = RECORD.size - 4
+TIMESTAMP = struct.Struct('<d')
+
+# 封存檔 (含改名保留的 .bad), 保留策略依檔名的日期清理
+SEGMENT_PATTERN = re.compile(r'^metrics_(?P<date>\d{8})\.bin(?:\.\d+\.bad)?$')
+
+FIELDS = ['timestamp', 'cpu.usage', 'cpu.temperature', 'ram.usage', 'gpu.usage', 'gpu.temperature', 'swap.usage']
+
+
+class ArchiveRecord:
+    __slots__ = ('timestamp', 'values', 'drives')
+
+    def __init__(self, timestamp: float, values: dict, drives: dict) -> None:
+        self.timestamp = timestamp
+        self.values = values  # {'cpu.usage': ..., ...}
+        self.drives = drives  # {drive name: (usage, temperature)}
+
+
+# 二進位樣本封存: 每天一個只會附加的檔案, 固定長度紀錄 + crc32, 讀取時以 mmap 只載入需要的頁面
+class MetricsArchive:
+
+    def __init__(self, directory: str = 'archive', flush_interval: float = 60, max_age_days: int = 30, max_total_bytes: int = 256 * 1024 * 1024,
+                 logger: logging.Logger = None) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval  # 累積多久才寫入並 fsync (秒), 減少 SD 卡寫入次數
+        self.enabled = True                   # 關閉時不再寫入 (由監控執行緒在下一筆樣本關閉檔案)
+        self.max_age_days = max_age_days        # 超過幾天的檔案刪除
+        self.max_total_bytes = max_total_bytes  # 所有檔案總大小上限, 超過時由最舊的開始刪除
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.fd = None
+        self.day = None
+        self.drive_names = []  # 目前檔案的硬碟欄位
+        self.size = 0          # 目前檔案已寫入的長度
+        self.pending = bytearray()
+        self.last_flush = time.monotonic()
+
+    def segment_path(self, day: str) -> str:
+        return os.path.join(self.directory, f'metrics_{day}.bin')
+
+    # 開啟 (或建立) 某一天的檔案; 尾端不完整的紀錄 (寫入中斷電) 會被截掉, 無法辨識的檔頭改名為 .bad 後重新建立
+    def open_segment(self, day: str, drive_names: list):
+        self.close()
+        self.day = day  # 開啟失敗時當天不再重試 (錯誤只記錄一次), 換日後再開啟
+        os.makedirs(self.directory, exist_ok=True)
+        self.prune(day)
+        path = self.segment_path(day)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size >= HEADER_SIZE:
+                try:
+                    self.drive_names = self.read_header(os.pread(fd, HEADER_SIZE, 0))
+                except ValueError as e:
+                    bad_path = f'{path}.{int(time.time())}.bad'
+                    self.logger.error(f'metrics archive {path}: {e}, moved to {bad_path}')
+                    os.rename(path, bad_path)
+                    os.close(fd)
+                    fd = None
+                    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                    size = 0
+            if size < HEADER_SIZE:
+                self.drive_names = drive_names[:DRIVE_SLOTS]
+                os.ftruncate(fd, 0)
+                os.pwrite(fd, self.pack_header(self.drive_names), 0)
+                os.fsync(fd)
+                size = HEADER_SIZE
+            else:
+                torn = (size - HEADER_SIZE) % RECORD.size
+                if torn:
+                    self.logger.error(f'metrics archive {path}: drop torn record ({torn} bytes)')
+                    size -= torn
+                    os.ftruncate(fd, size)
+        except Exception:
+            if fd is not None:
+                os.close(fd)
+            raise
+        self.fd = fd
+        self.size = size
+
+    # 換日時依保存天數 / 總大小刪除舊檔 (不含當天)
+    def prune(self, today: str):
+        oldest = time.strftime('%Y%m%d', time.localtime(time.mktime(time.strptime(today, '%Y%m%d')) - self.max_age_days * 86400))
+        segments = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match is None or match['date'] >= today:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if match['date'] < oldest:
+                    os.remove(path)
+                else:
+                    segments.append((match['date'], path, os.path.getsize(path)))
+            except OSError as e:
+                self.logger.error(f'metrics archive remove {path} error: {e}')
+        total = sum(size for _, _, size in segments)
+        for _, path, size in sorted(segments):
+            if total <= self.max_total_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                self.logger.error(f'metrics archive remove {path} error: {e}')
+
+    # 新出現的硬碟加入檔頭的空欄位 (檔頭在同一個磁區內, 原地覆寫)
+    def add_drives(self, drive_names: list):
+        added = [name for name in drive_names if name not in self.drive_names][:DRIVE_SLOTS - len(self.drive_names)]
+        if added:
+            self.drive_names = self.drive_names + added
+            os.pwrite(self.fd, self.pack_header(self.drive_names), 0)
+
+    @staticmethod
+    def pack_header(drive_names: list) -> bytes:
+        header = HEADER.pack(MAGIC, VERSION, RECORD.size, len(drive_names))
+        header += b''.join(name.encode()[:DRIVE_NAME_SIZE].ljust(DRIVE_NAME_SIZE, b'\0') for name in drive_names)
+        return header.ljust(HEADER_SIZE, b'\0')
+
+    @staticmethod
+    def read_header(data) -> list:
+        magic, version, record_size, drive_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f'unsupported metrics archive (magic {magic}, version {version}, record size {record_size})')
+        offset = HEADER.size
+        names = []
+        for index in range(drive_count):
+            start = offset + index * DRIVE_NAME_SIZE
+            names.append(bytes(data[start:start + DRIVE_NAME_SIZE]).rstrip(b'\0').decode())
+        return names
+
+    # 附加一筆紀錄 (先放在記憶體, 每 flush_interval 秒寫入一次)
+    def append(self, timestamp: float, monitor):
+        if not self.enabled:
+            if self.fd is not None:
+                self.close()
+            return
+        try:
+            day = time.strftime('%Y%m%d', time.localtime(timestamp))
+            if day != self.day:
+                self.flush()
+                self.open_segment(day, sorted(monitor.drives))
+            if self.fd is None:
+                return  # 當天的檔案無法開啟 (已記錄錯誤)
+            if len(self.drive_names) < DRIVE_SLOTS and len(monitor.drives) > len(self.drive_names):
+                self.add_drives(sorted(monitor.drives))
+            drive_values = []
+            for name in self.drive_names:
+                driveInfo = monitor.drives.get(name)
+                drive_values += [driveInfo.usage, driveInfo.temperature] if driveInfo is not None else [math.nan, math.nan]
+            drive_values += [math.nan] * (DRIVE_SLOTS * 2 - len(drive_values))
+            sample = monitor.sample
+            swap_usage = sample.swap_used * 100 / sample.swap_total if sample is not None and sample.swap_total > 0 else math.nan
+            payload = RECORD.pack(timestamp, monitor.cpu.usage, monitor.cpu.temperature, monitor.ram.usage,
+                                  monitor.gpu.usage, monitor.gpu.temperature, swap_usage, *drive_values, 0)[:RECORD_PAYLOAD_SIZE]
+            self.pending += payload
+            self.pending += struct.pack('<I', zlib.crc32(payload))
+            if time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+        except Exception as e:
+            self.logger.error(f'metrics archive append error: {e}')
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if self.fd is None or not self.pending:
+            return
+        try:
+            os.pwrite(self.fd, self.pending, self.size)
+            os.fsync(self.fd)
+            self.size += len(self.pending)
+        except Exception as e:
+            self.logger.error(f'metrics archive flush error: {e}')
+        self.pending.clear()
+
+    def close(self):
+        if self.fd is not None:
+            self.flush()
+            os.close(self.fd)
+            self.fd = None
+            self.day = None
+
+    # 查詢 [start, end] 之間已寫入檔案的紀錄 (依時間排序), crc 不符的紀錄會被略過
+    def query(self, start: float, end: float):
+        day = time.mktime(time.localtime(start)[:3] + (0, 0, 0, 0, 0, -1))
+        while day <= end:
+            path = self.segment_path(time.strftime('%Y%m%d', time.localtime(day)))
+            if os.path.exists(path):
+                yield from self.query_segment(path, start, end)
+            day = time.mktime(time.localtime(day + 86400 + 3600)[:3] + (0, 0, 0, 0, 0, -1))  # 下一天 00:00 (考慮日光節約)
+
+    def query_segment(self, path: str, start: float, end: float):
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            count = max(size - HEADER_SIZE, 0) // RECORD.size
+            if count == 0:
+                return
+            with mmap.mmap(file.fileno(), HEADER_SIZE + count * RECORD.size, access=mmap.ACCESS_READ) as data:
+                drive_names = self.read_header(data)
+                # 二分搜尋起點, 只讀取需要的頁面
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    if TIMESTAMP.unpack_from(data, HEADER_SIZE + middle * RECORD.size)[0] < start:
+                        low = middle + 1
+                    else:
+                        high = middle
+                for index in range(low, count):
+                    offset = HEADER_SIZE + index * RECORD.size
+                    values = RECORD.unpack_from(data, offset)
+                    if values[0] > end:
+                        break
+                    if zlib.crc32(data[offset:offset + RECORD_PAYLOAD_SIZE]) != values[-1]:
+                        continue  # 毀損 / 寫入中斷的紀錄
+                    drives = {name: (values[7 + slot * 2], values[8 + slot * 2]) for slot, name in enumerate(drive_names)}
+                    yield ArchiveRecord(values[0], dict(zip(FIELDS[1:], values[1:7])), drives)
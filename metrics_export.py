@@ -0,0 +1,136 @@
+import os
+import csv
+import io
+import json
+import time
+import threading
+import logging
+
+FORMATS = ['jsonl', 'csv']
+
+# CSV 欄位 (每個項目一列): 所有紀錄的欄位固定, 硬碟增減也不影響
+CSV_FIELDS = ['timestamp', 'name', 'value', 'min', 'avg', 'max', 'p95', 'stdev', 'energy']
+
+
+# 結構化的定期紀錄輸出 (JSON Lines / CSV), 累積後批次寫入
+class MetricsExporter:
+
+    def __init__(self, directory: str = '.', format: str = 'jsonl', batch_size: int = 10, flush_interval: float = 3600, logger: logging.Logger = None) -> None:
+        if format not in FORMATS:
+            raise ValueError(f'unknown export format {format}')
+        self.directory = directory
+        self.format = format
+        self.batch_size = batch_size          # 累積幾筆紀錄寫入一次
+        self.flush_interval = flush_interval  # 最長多久寫入一次 (秒)
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.pending = []  # 已格式化的行
+        self.records = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.csv_paths = {}  # {當天的檔名: 實際寫入的檔名}, 已檢查過欄位的檔案
+
+    def path(self, timestamp: float) -> str:
+        return os.path.join(self.directory, f'hardwaremonitor_{time.strftime("%Y%m%d", time.localtime(timestamp))}.{self.format}')
+
+    # 新增一筆紀錄: {'timestamp': epoch, 'metrics': {name: {value, min, avg, max, p95}}}, 核心 / 電源軌為 {value, avg, max, stdev[, energy]}
+    def write(self, record: dict):
+        with self.lock:
+            if self.format == 'jsonl':
+                self.pending.append((record['timestamp'], json.dumps(record, separators=(',', ':')) + '\n'))
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator='\n')
+                for name, metric in record['metrics'].items():
+                    writer.writerow([record['timestamp'], name] + [metric.get(field) for field in CSV_FIELDS[2:]])
+                self.pending.append((record['timestamp'], buffer.getvalue()))
+            self.records += 1
+            if self.records >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        self.last_flush = time.monotonic()
+        self.records = 0
+        if not self.pending:
+            return
+        try:
+            lines_by_path = {}
+            for timestamp, lines in self.pending:
+                lines_by_path.setdefault(self.path(timestamp), []).append(lines)
+            for path, lines in lines_by_path.items():
+                if self.format == 'csv':
+                    path = self.csv_path(path)
+                write_header = self.format == 'csv' and not os.path.exists(path)
+                with open(path, 'a', newline='') as file:
+                    if write_header:
+                        file.write(','.join(CSV_FIELDS) + '\n')
+                    file.write(''.join(lines))
+        except Exception as e:
+            self.logger.error(f'metrics export error: {e}')
+        self.pending = []
+
+    # 同一天的 CSV 若是舊版欄位 (例如升級前建立), 改寫到 hardwaremonitor_YYYYMMDD_1.csv ... 避免同一檔案欄位數不一致
+    def csv_path(self, path: str) -> str:
+        actual = self.csv_paths.get(path)
+        if actual is not None:
+            return actual
+        header = ','.join(CSV_FIELDS)
+        base, extension = os.path.splitext(path)
+        actual = path
+        suffix = 0
+        while os.path.exists(actual):
+            with open(actual, newline='') as file:
+                if file.readline().rstrip('\r\n') == header:
+                    break
+            suffix += 1
+            actual = f'{base}_{suffix}{extension}'
+        if actual != path:
+            self.logger.info(f'{path} has different columns, export to {actual}')
+        self.csv_paths = {path: actual}  # 只保留當天
+        return actual
+
+    def close(self):
+        self.flush()
+
+
+# 由監控數值與期間統計建立一筆紀錄
+def build_record(timestamp: float, monitor, summary: dict, vector_summary: dict = None) -> dict:
+    metrics = {}
+
+    def add(name, value):
+        metric = {'value': value}
+        values = summary.get(name)
+        if values is not None:
+            metric.update(zip(('min', 'avg', 'max', 'p95'), values))
+        metrics[name] = metric
+
+    add('cpu.usage', monitor.cpu.usage)
+    add('cpu.temperature', monitor.cpu.temperature)
+    add('ram.usage', monitor.ram.usage)
+    add('gpu.usage', monitor.gpu.usage)
+    add('gpu.temperature', monitor.gpu.temperature)
+    for driveInfo in monitor.drives.values():
+        add(f'drive.{driveInfo.name}.usage', driveInfo.usage)
+        add(f'drive.{driveInfo.name}.temperature', driveInfo.temperature)
+    for name, values in (vector_summary or {}).items():
+        metric = {'value': vector_value(monitor, name)}
+        metric.update(values)
+        metrics[name] = metric
+    return {'timestamp': round(timestamp, 3), 'metrics': metrics}
+
+
+# 向量指標的最新數值: 'cpu.core3.usage' / 'cpu.core3.frequency' / 'power.VDD_IN'
+def vector_value(monitor, name: str):
+    sample = monitor.sample
+    if sample is None:
+        return None
+    if name.startswith('power.'):
+        rail = sample.rails.get(name[len('power.'):])
+        return rail[0] if rail is not None else None
+    _, core, metric = name.split('.')
+    values = sample.cpu_loads if metric == 'usage' else sample.cpu_freqs
+    index = int(core[len('core'):])
+    return values[index] if index < len(values) else None
@@ -0,0 +1,144 @@
+import threading
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from alarm_state import FIRING
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# (metric 名稱, 單位, 說明, accessor(monitor))
+SINGLE_GAUGES = [
+    ('hardwaremonitor_cpu_usage_percent', 'percent', 'CPU usage', lambda monitor: monitor.cpu.usage),
+    ('hardwaremonitor_cpu_temperature_celsius', 'celsius', 'CPU temperature', lambda monitor: monitor.cpu.temperature),
+    ('hardwaremonitor_ram_usage_percent', 'percent', 'RAM usage', lambda monitor: monitor.ram.usage),
+    ('hardwaremonitor_gpu_usage_percent', 'percent', 'GPU usage', lambda monitor: monitor.gpu.usage),
+    ('hardwaremonitor_gpu_temperature_celsius', 'celsius', 'GPU temperature', lambda monitor: monitor.gpu.temperature),
+]
+DRIVE_GAUGES = [
+    ('hardwaremonitor_drive_usage_percent', 'percent', 'Drive usage', 'usage'),
+    ('hardwaremonitor_drive_temperature_celsius', 'celsius', 'Drive temperature', 'temperature'),
+]
+# 向量指標: (metric 名稱, 單位, 說明, VectorMetrics 群組, label 名稱)
+VECTOR_GAUGES = [
+    ('hardwaremonitor_cpu_core_usage_percent', 'percent', 'Per-core CPU usage', 'cpu.core.usage', 'core'),
+    ('hardwaremonitor_cpu_core_frequency_megahertz', 'megahertz', 'Per-core CPU frequency', 'cpu.core.frequency', 'core'),
+    ('hardwaremonitor_power_milliwatts', 'milliwatts', 'Instantaneous power per rail', 'power', 'rail'),
+]
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: dict) -> str:
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + '}'
+
+
+def format_value(value) -> str:
+    if value is None or value != value:  # None / NaN (例如關閉的核心)
+        return 'NaN'
+    return repr(float(value))
+
+
+# 以 OpenMetrics 文字格式輸出目前的監控數值與通報狀態
+def render_openmetrics(monitor, timestamp: float) -> bytes:
+    lines = []
+    for name, unit, help, accessor in SINGLE_GAUGES:
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'# UNIT {name} {unit}')
+        lines.append(f'# HELP {name} {help}.')
+        lines.append(f'{name} {format_value(accessor(monitor))}')
+    drives = list(monitor.drives.values())
+    for name, unit, help, attribute in DRIVE_GAUGES:
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'# UNIT {name} {unit}')
+        lines.append(f'# HELP {name} {help}.')
+        for driveInfo in drives:
+            lines.append(f'{name}{format_labels({"drive": driveInfo.name})} {format_value(getattr(driveInfo, attribute))}')
+    vector_metrics = monitor.vector_metrics
+    if vector_metrics is not None:
+        for name, unit, help, group, label in VECTOR_GAUGES:
+            latest = vector_metrics.latest(group)
+            if latest is None:
+                continue
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'# UNIT {name} {unit}')
+            lines.append(f'# HELP {name} {help}.')
+            for instance, value in zip(*latest):
+                lines.append(f'{name}{format_labels({label: instance})} {format_value(value)}')
+        power = vector_metrics.series.get('power')
+        if power is not None:
+            lines.append('# TYPE hardwaremonitor_energy_joules gauge')
+            lines.append('# UNIT hardwaremonitor_energy_joules joules')
+            lines.append('# HELP hardwaremonitor_energy_joules Energy per rail since the start of the current logging period.')
+            for instance, value in zip(power.instances, power.energy):
+                lines.append(f'hardwaremonitor_energy_joules{format_labels({"rail": instance})} {format_value(value)}')
+    lines.append('# TYPE hardwaremonitor_alarm_firing gauge')
+    lines.append('# HELP hardwaremonitor_alarm_firing 1 while the alarm item is firing.')
+    for rule in monitor.alarm_rules.rules:
+        item = rule.item
+        for instance, state in rule.states.items():
+            labels = {'name': item.name, 'target': item.target, 'operator': item.operator or '>=', 'threshold': item.threshold}
+            if instance is not None:
+                labels['instance'] = instance
+            lines.append(f'hardwaremonitor_alarm_firing{format_labels(labels)} {1 if state.state == FIRING else 0}')
+    lines.append('# TYPE hardwaremonitor_sample_timestamp_seconds gauge')
+    lines.append('# UNIT hardwaremonitor_sample_timestamp_seconds seconds')
+    lines.append('# HELP hardwaremonitor_sample_timestamp_seconds Time of the latest sample.')
+    lines.append(f'hardwaremonitor_sample_timestamp_seconds {timestamp:.3f}')
+    lines.append('# EOF\n')
+    return '\n'.join(lines).encode()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.body  # 每筆樣本產生一次, 這裡只讀取參考
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 提供 /metrics 的 HTTP server (背景執行緒)
+class MetricsHTTPServer:
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 9100, logger: logging.Logger = None) -> None:
+        self.host = host
+        self.port = port
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+            self.server.daemon_threads = True
+            self.server.body = b'# EOF\n'
+            self.port = self.server.server_address[1]
+            self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True)
+            self.thread.start()
+            self.logger.info(f'metrics server listening on {self.host}:{self.port}')
+        except Exception as e:
+            self.server = None
+            self.logger.error(f'start metrics server error: {e}')
+
+    def render(self, monitor, timestamp: float) -> bytes:
+        return render_openmetrics(monitor, timestamp)
+
+    # 替換輸出內容 (單一參考指派)
+    def publish(self, body: bytes):
+        if self.server is not None:
+            self.server.body = body
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
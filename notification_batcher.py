@@ -0,0 +1,40 @@
+import json
+import time
+from ezpronotification import EZProNotification
+
+
+# 合併通報: window 秒內發生的所有事件合併為一筆 EZPro event (window = 0 時合併同一次 tick 的事件)
+class NotificationBatcher:
+
+    def __init__(self, submit, window: float = 0) -> None:
+        self.submit = submit  # submit(json 字串), 例如 NotificationDispatcher.submit
+        self.window = window  # 合併的時間 (秒)
+        self.pending = []     # [(epoch, description)]
+        self.first_at = None  # 第一筆待送事件的時間 (monotonic)
+
+    def add(self, description: str, now: float = None):
+        if self.first_at is None:
+            self.first_at = time.monotonic() if now is None else now
+        self.pending.append((time.time(), description))
+
+    # 每次 tick 結束時呼叫, 時間到才送出
+    def tick(self, now: float = None):
+        if self.first_at is None:
+            return
+        now = time.monotonic() if now is None else now
+        if now - self.first_at >= self.window:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending = self.pending
+        self.pending = []
+        self.first_at = None
+        if len(pending) == 1:
+            ezpro_notification = EZProNotification(pending[0][1])
+        else:
+            description = f"{len(pending)} alarms: " + "; ".join(text for _, text in pending)
+            events = [{'time': round(timestamp, 3), 'description': text} for timestamp, text in pending]
+            ezpro_notification = EZProNotification(description, events)
+        self.submit(json.dumps(ezpro_notification.__dict__))
@@ -0,0 +1,192 @@
+import time
+import threading
+import queue
+import logging
+from ezproserver import EZProServer
+from ezpronotification import EZProNotification
+from notification_outbox import NotificationOutbox
+from ezpro_health import EZProHealthMonitor
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+
+# 通報佇列: 監控執行緒只負責放入佇列, 由背景執行緒透過長連線 Session 送到 EZPro
+class NotificationDispatcher:
+
+    def __init__(self, ezpro: EZProServer, logger: logging.Logger = None, should_log=None, max_queue: int = 100,
+                 overflow: str = DROP_OLDEST, timeout: tuple = (3, 5), retries: int = 3, backoff: float = 1.0,
+                 outbox: NotificationOutbox = None, max_backoff: float = 300, health: EZProHealthMonitor = None) -> None:
+        self.ezpro = ezpro
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.should_log = should_log or (lambda: True)  # 是否將通報結果寫入 log
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflow = overflow  # 佇列已滿時丟棄最舊 (DROP_OLDEST) 或最新 (DROP_NEWEST) 的通報
+        self.timeout = timeout    # (connect, read) 秒
+        self.retries = retries
+        self.backoff = backoff    # 第 n 次重試前等待 backoff * 2^(n-1) 秒
+        self.dropped = 0
+        self.outbox = outbox            # 重試後仍送不出去的通報存到磁碟, 恢復連線後依序重送; None 時丟棄
+        self.max_backoff = max_backoff  # 重送間隔上限 (秒)
+        self.health = health            # 背景連線檢查, 確定無法連線時直接存到 outbox, 不必等待重試逾時
+        self.replay_failures = 0
+        self.next_replay = 0
+        self.session = None
+        self.session_key = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if self.thread is not None and self.stop_event.is_set():
+            self.thread.join()  # 上一次 stop() 逾時時仍在送出的執行緒
+            self.thread = None
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name='notification-dispatcher', daemon=True)
+            self.thread.start()
+
+    # 停止背景執行緒, 最多等待 timeout 秒把佇列送完
+    def stop(self, timeout: float = 5):
+        if self.thread is None:
+            self.close()
+            return
+        self.stop_event.set()  # 不再重試, 佇列中剩下的通報各送一次
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            self.logger.error(f'notification dispatcher still sending after {timeout}s, close when finished')
+        else:
+            self.thread = None
+
+    # 關閉 Session 與 outbox (背景執行緒結束時呼叫, 不會在送出 / 重送途中關閉)
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if self.outbox is not None:
+            self.outbox.close()
+
+    # 放入一筆通報 (不會阻塞)
+    def submit(self, message: str) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.overflow == DROP_OLDEST:
+                try:
+                    dropped_message = self.queue.get_nowait()
+                    self.queue.put_nowait(message)
+                    self.logger.error(f"notification queue full, drop: {dropped_message}")
+                    return True
+                except (queue.Empty, queue.Full):
+                    pass
+            self.logger.error(f"notification queue full, drop: {message}")
+            return False
+
+    def run(self):
+        try:
+            self.dispatch()
+        finally:
+            self.close()
+
+    def dispatch(self):
+        while True:
+            try:
+                message = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                if self.stop_event.is_set():
+                    break
+                self.replay()
+                continue
+            if self.outbox is not None and (len(self.outbox) > 0 or self.server_down()):
+                self.store(message)  # 排在尚未重送的通報之後, 維持順序
+                self.replay()
+                continue
+            response = self.deliver(message)
+            if self.outbox is not None and self.retryable(response):
+                self.store(message)
+                self.schedule_replay()
+
+    def store(self, message: str):
+        try:
+            self.outbox.put(message)
+        except Exception as e:
+            self.logger.error(f"write notification outbox error: {e}, drop: {message}")
+
+    # 連線錯誤 (send_notification 回傳錯誤字串) 或 5xx 需要重送, 其他 (包含 4xx) 不重送
+    @staticmethod
+    def retryable(response) -> bool:
+        status_code = getattr(response, 'status_code', None)
+        return status_code is None or status_code >= 500
+
+    def send(self, message: str):
+        return EZProNotification.send_notification(self.ezpro, message, session=self.get_session(), timeout=self.timeout)
+
+    # 送出一筆通報, 連線錯誤或 5xx 依 backoff 重試
+    def deliver(self, message: str):
+        response = None
+        for attempt in range(self.retries + 1):
+            if attempt > 0 and self.stop_event.wait(self.backoff * 2 ** (attempt - 1)):
+                break
+            response = self.send(message)
+            if not self.retryable(response):
+                break
+        self.log_result(message, response)
+        return response
+
+    def log_result(self, message: str, response):
+        if self.should_log():
+            if getattr(response, 'status_code', None) == 200:
+                self.logger.info(f"send notification sucess: {message}")
+            else:
+                self.logger.error(f"send notification fail: {response}, notification content: {message}")
+
+    def server_down(self) -> bool:
+        return self.health is not None and self.health.unreachable()
+
+    # 連線恢復時立即重送 (由 EZProHealthMonitor 呼叫)
+    def resume_replay(self):
+        self.replay_failures = 0
+        self.next_replay = 0
+
+    # 下一次重送的時間: backoff * 2^n, 最多 max_backoff
+    def schedule_replay(self):
+        self.replay_failures += 1
+        self.next_replay = time.monotonic() + min(self.backoff * 2 ** self.replay_failures, self.max_backoff)
+
+    # 依序重送磁碟上的通報, 失敗時等到下一次重送時間; 佇列有新的通報時先讓出
+    def replay(self):
+        if self.outbox is None or self.stop_event.is_set() or time.monotonic() < self.next_replay or self.server_down():
+            return
+        while not self.stop_event.is_set():
+            try:
+                entry = self.outbox.peek()
+            except Exception as e:
+                self.logger.error(f"read notification outbox error: {e}")
+                return
+            if entry is None:
+                return
+            entry_id, message = entry
+            response = self.send(message)
+            if self.retryable(response):
+                self.schedule_replay()
+                return
+            self.log_result(message, response)
+            self.outbox.remove(entry_id)
+            self.replay_failures = 0
+            if not self.queue.empty():
+                return
+
+    # 共用的 Session (keep-alive + Digest auth nonce 重複使用), EZPro 帳號變更時重建
+    def get_session(self) -> 'requests.Session':
+        key = (self.ezpro.username, self.ezpro.password)
+        if self.session is None or self.session_key != key:
+            if self.session is not None:
+                self.session.close()
+            import requests  # 第一次通報時才載入
+            from requests.auth import HTTPDigestAuth
+            self.session = requests.Session()
+            self.session.auth = HTTPDigestAuth(f"{self.ezpro.username}", f"{self.ezpro.password}")
+            self.session.headers.update({'Content-Type': 'application/json'})
+            self.session_key = key
+        return self.session
@@ -0,0 +1,67 @@
+import time
+import sqlite3
+import threading
+import logging
+
+
+# 未送達通報的磁碟佇列 (SQLite): 依寫入順序重送, 超過筆數上限時刪除最舊的, 超過保存時間的自動過期
+class NotificationOutbox:
+
+    def __init__(self, path: str = 'outbox.db', max_entries: int = 10000, max_age: float = 7 * 86400, logger: logging.Logger = None) -> None:
+        self.path = path
+        self.max_entries = max_entries  # 最多保留的筆數
+        self.max_age = max_age          # 保存時間 (秒)
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.lock = threading.Lock()
+        self.connection = None
+        self.size = 0  # 目前筆數, 不必每次 COUNT(*)
+
+    def open(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')  # WAL 下斷電最多遺失最後一筆, 不會損毀
+            self.connection.execute('CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, message TEXT NOT NULL)')
+            self.size = self.connection.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+        return self.connection
+
+    # 加入一筆未送達的通報
+    def put(self, message: str, now: float = None):
+        now = time.time() if now is None else now
+        with self.lock:
+            connection = self.open()
+            connection.execute('INSERT INTO outbox (created, message) VALUES (?, ?)', (now, message))
+            self.size += 1
+            if self.size > self.max_entries:
+                dropped = connection.execute('DELETE FROM outbox WHERE id IN (SELECT id FROM outbox ORDER BY id LIMIT ?)', (self.size - self.max_entries,)).rowcount
+                self.size -= dropped
+                self.logger.error(f'notification outbox full, drop {dropped} oldest notification(s)')
+
+    # 最舊的一筆 (id, message), 沒有時回傳 None; 先刪除已過期的
+    def peek(self, now: float = None):
+        now = time.time() if now is None else now
+        with self.lock:
+            connection = self.open()
+            if self.size == 0:
+                return None
+            expired = connection.execute('DELETE FROM outbox WHERE created < ?', (now - self.max_age,)).rowcount
+            if expired:
+                self.size -= expired
+                self.logger.error(f'notification outbox: {expired} notification(s) expired')
+            return connection.execute('SELECT id, message FROM outbox ORDER BY id LIMIT 1').fetchone()
+
+    # 已送達 (或不需重送) 的通報
+    def remove(self, entry_id: int):
+        with self.lock:
+            self.size -= self.open().execute('DELETE FROM outbox WHERE id = ?', (entry_id,)).rowcount
+
+    def __len__(self) -> int:
+        with self.lock:
+            self.open()
+            return self.size
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,275 @@
+import os
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from hardwaremonitor_linux import AlarmItem
+from metrics_export import FORMATS
+from log_rotation import shared_retention
+
+PARAMETERS_PATH = 'parameters.xml'
+LOGGING_PERIODS = ["10", "30", "60"]
+
+# parameters.xml 的讀取 / 儲存, GUI (program.py) 與 daemon (hardwaremonitor.py) 共用
+
+
+# 設定檔存取: 只解析一次並保留在記憶體, 儲存時合併短時間內的多次變更, 以 暫存檔 + fsync + rename 寫入
+class ParametersStore:
+
+    def __init__(self, path: str = PARAMETERS_PATH, save_delay: float = 0.5, poll_interval: float = 2.0, logger: logging.Logger = None) -> None:
+        self.path = path
+        self.save_delay = save_delay        # 變更後多久寫入 (秒), 期間的變更合併為一次寫入
+        self.poll_interval = poll_interval  # 檢查檔案是否被外部修改的間隔 (秒)
+        self.logger = logger or logging.getLogger('MAIN')
+        self.lock = threading.RLock()
+        self.root = None       # 檔案不存在時為 None
+        self.signature = None  # 上次讀取 / 寫入時的 (mtime_ns, size)
+        self.save_timer = None
+        self.watch_thread = None
+        self.stop_event = threading.Event()
+        self.load()
+
+    def stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    # 解析設定檔, 解析失敗時保留原本的內容
+    def load(self) -> bool:
+        with self.lock:
+            signature = self.stat_signature()
+            try:
+                self.root = ET.parse(self.path).getroot()
+            except FileNotFoundError:
+                self.root = None
+            except ET.ParseError as e:
+                self.logger.error(f'parse {self.path} error: {e}')
+                self.signature = signature  # 同一份損毀的檔案不重複解析
+                return False
+            self.signature = signature
+            return True
+
+    # 檔案被外部修改時重新載入, 回傳是否重新載入
+    def check_reload(self) -> bool:
+        with self.lock:
+            signature = self.stat_signature()
+            if signature is None or signature == self.signature or self.save_timer is not None:
+                return False
+            reloaded = self.load()
+        if reloaded:
+            self.logger.info(f'{self.path} changed, reloaded')
+        return reloaded
+
+    # 背景執行緒定期檢查 (daemon 使用), 重新載入後呼叫 on_reload(root)
+    def start_watch(self, on_reload):
+        def run():
+            while not self.stop_event.wait(self.poll_interval):
+                try:
+                    if self.check_reload():
+                        on_reload(self.root)
+                except Exception as e:
+                    self.logger.error(f'reload {self.path} error: {e}')
+        self.watch_thread = threading.Thread(target=run, name='parameters-watch', daemon=True)
+        self.watch_thread.start()
+
+    def ensure_root(self):
+        if self.root is None:
+            self.logger.error(f"{self.path} not found, creating new one.")
+            self.root = ET.Element('parameters')
+        return self.root
+
+    # 設定單一欄位 (不存在時新增)
+    def set_text(self, tag: str, text: str):
+        with self.lock:
+            root = self.ensure_root()
+            node = root.find(tag)
+            if node is None:
+                node = ET.SubElement(root, tag)
+            node.text = text
+
+    # 以 AlarmItem 清單取代所有通報項目
+    def set_alarm_items(self, items: list):
+        with self.lock:
+            root = self.ensure_root()
+            for node in root.findall('AlarmItem'):
+                root.remove(node)
+            for item in items:
+                node = ET.SubElement(root, 'AlarmItem')
+                node.set('name', item.name)
+                node.set('target', item.target)
+                node.set('threshold', str(item.threshold))
+                for attribute in ['hold_time', 'hysteresis', 'cooldown', 'reminder_interval', 'operator']:
+                    if getattr(item, attribute) is not None:
+                        node.set(attribute, str(getattr(item, attribute)))
+
+    # 排程寫入, save_delay 內的多次呼叫只寫入一次
+    def save(self):
+        with self.lock:
+            if self.save_timer is None:
+                self.save_timer = threading.Timer(self.save_delay, self.flush)
+                self.save_timer.daemon = True
+                self.save_timer.start()
+
+    # 立即寫入: 寫到暫存檔並 fsync 後 rename, 斷電時不會留下寫到一半的設定檔
+    def flush(self):
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+            if self.root is None:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            temp_path = os.path.join(directory, f'.{os.path.basename(self.path)}.tmp')
+            try:
+                data = ET.tostring(self.root, encoding='utf-8', xml_declaration=True)
+                with open(temp_path, 'wb') as file:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, self.path)
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self.signature = self.stat_signature()  # 自己寫入的變更不觸發重新載入
+                self.logger.info(f'save {self.path} success')
+            except Exception as e:
+                self.logger.error(f'save {self.path} error: {e}')
+
+    def stop(self):
+        self.stop_event.set()
+        with self.lock:
+            if self.save_timer is not None:
+                self.flush()
+
+
+# EZPro 相關參數
+def apply_ezpro_parameters(root, monitor):
+    if root.find('EZPro_IP') is not None:
+        monitor.ezpro.ip = root.find('EZPro_IP').text
+    if root.find('EZPro_Port') is not None:
+        monitor.ezpro.port = root.find('EZPro_Port').text
+    if root.find('EZPro_Username') is not None:
+        monitor.ezpro.username = root.find('EZPro_Username').text
+    if root.find('EZPro_Password') is not None:
+        monitor.ezpro.password = root.find('EZPro_Password').text
+
+
+# 通報項目
+def read_alarm_items(root) -> list:
+    return [AlarmItem(item.get('name'), item.get('target'), item.get('threshold'), item.get('hold_time'), item.get('hysteresis'), item.get('cooldown'), item.get('reminder_interval'), item.get('operator'))
+            for item in root.findall('AlarmItem')]
+
+
+# 重新載入時沿用內容相同的 AlarmItem 物件, 規則引擎會保留原本的狀態 (不會重複通報)
+def merge_alarm_items(current: list, loaded: list) -> list:
+    def key(item):
+        return (item.name, item.target, str(item.threshold), item.hold_time, item.hysteresis, item.cooldown, item.reminder_interval, item.operator)
+    existing = {}
+    for item in current:
+        existing.setdefault(key(item), []).append(item)
+    merged = []
+    for item in loaded:
+        same = existing.get(key(item))
+        merged.append(same.pop(0) if same else item)
+    return merged
+
+
+# 通報開關
+def apply_switches_parameters(root, monitor):
+    if root.find('Enable_NotifyToEZPro') is not None:
+        monitor.enableNotifyToEzPro.set(int(root.find('Enable_NotifyToEZPro').text))
+    if root.find('Enable_LoggingNotification') is not None:
+        monitor.enableLoggingNotification.set(int(root.find('Enable_LoggingNotification').text))
+    if root.find('Notification_Window') is not None:  # 合併通報的時間 (秒), 0 = 合併同一次取樣的通報
+        monitor.notification_batcher.window = max(float(root.find('Notification_Window').text), 0)
+
+
+# Logging 相關參數 (定期紀錄週期, 結構化輸出, OpenMetrics, log 保留策略)
+def apply_logging_parameters(root, monitor, logger: logging.Logger):
+    logging_period = root.find('Logging_Period')
+    if logging_period is not None and logging_period.text in LOGGING_PERIODS:
+        monitor.logging_period = logging_period.text
+    else:
+        logger.error(f'read logging parameters error: invalid data')
+
+    export_format = root.find('Export_Format')  # jsonl / csv, 不設定 (或移除) 時只寫入 log
+    if export_format is None:
+        monitor.set_export_format(None)
+    elif export_format.text in FORMATS:
+        monitor.set_export_format(export_format.text)
+    else:
+        logger.error(f'read logging parameters error: invalid export format {export_format.text}')
+
+    metrics_port = root.find('Metrics_Port')  # OpenMetrics endpoint, 不設定 (或移除) 時關閉
+    if metrics_port is None:
+        monitor.disable_metrics_server()
+    elif metrics_port.text is not None and metrics_port.text.isdigit():
+        monitor.enable_metrics_server(int(metrics_port.text))
+    else:
+        logger.error(f'read logging parameters error: invalid metrics port {metrics_port.text}')
+
+    # log 保留策略: 保存天數 / 總大小上限 (MB)
+    try:
+        if root.find('Log_Retention_Days') is not None:
+            shared_retention.max_age_days = int(root.find('Log_Retention_Days').text)
+        if root.find('Log_Retention_MB') is not None:
+            shared_retention.max_total_bytes = int(root.find('Log_Retention_MB').text) * 1024 * 1024
+    except ValueError as e:
+        logger.error(f'read logging parameters error: invalid retention {e}')
+
+    # 二進位樣本封存: 開關 (預設開啟), 保存天數 / 總大小上限 (MB)
+    archive = monitor.archive
+    archive.enabled = root.find('Enable_Archive') is None or root.find('Enable_Archive').text != '0'
+    try:
+        if root.find('Archive_Retention_Days') is not None:
+            archive.max_age_days = int(root.find('Archive_Retention_Days').text)
+        if root.find('Archive_Retention_MB') is not None:
+            archive.max_total_bytes = int(root.find('Archive_Retention_MB').text) * 1024 * 1024
+    except ValueError as e:
+        logger.error(f'read logging parameters error: invalid archive retention {e}')
+
+
+# 取樣來源, 取樣間隔 (秒) 與 adaptive 取樣, 硬碟溫度的更新間隔 / 快取時間 / smartctl 逾時 (秒)
+def apply_sampling_parameters(root, monitor, logger: logging.Logger):
+    for tag, attribute in [('Drive_Refresh_Interval', 'refresh_interval'), ('Drive_Cache_TTL', 'ttl'), ('Smartctl_Timeout', 'smartctl_timeout')]:
+        node = root.find(tag)
+        if node is None:
+            continue
+        try:
+            value = float(node.text)
+            if value <= 0:
+                raise ValueError(f'{value}')
+            setattr(monitor.drive_cache, attribute, value)
+        except (TypeError, ValueError) as e:
+            logger.error(f'read sampling parameters error: invalid {tag} {e}')
+    backend = root.find('Sampler_Backend')  # tegrastats (預設) / sysfs
+    if backend is not None:
+        try:
+            monitor.set_sampler_backend(backend.text)
+        except ValueError as e:
+            logger.error(f'read sampling parameters error: {e}')
+    try:
+        interval = float(root.find('Sample_Interval').text) if root.find('Sample_Interval') is not None else 1.0
+        adaptive = root.find('Adaptive_Sampling') is not None and root.find('Adaptive_Sampling').text == '1'
+        if interval <= 0:
+            raise ValueError(f'{interval}')
+        monitor.set_sample_interval(interval, adaptive)
+    except ValueError as e:
+        logger.error(f'read sampling parameters error: invalid sample interval {e}')
+
+
+# 套用所有參數 (daemon 啟動與重新載入時使用)
+def apply_parameters(root, monitor, logger: logging.Logger):
+    try:
+        apply_ezpro_parameters(root, monitor)
+        monitor.ezpro_health.request_check()
+        monitor.notification_items = merge_alarm_items(monitor.notification_items, read_alarm_items(root))
+        apply_switches_parameters(root, monitor)
+        apply_logging_parameters(root, monitor, logger)
+        apply_sampling_parameters(root, monitor, logger)
+        logger.info('apply parameters finished')
+    except Exception as e:
+        logger.error(f'apply parameters error: {e}')
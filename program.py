@@ -3,12 +3,16 @@ from tkinter import ttk
 from tkinter import messagebox
 from tkinter import PhotoImage
 from hardwaremonitor_linux import HardwareMonitor_Linux, CPUInfo, GPUInfo, DriveInfo, AlarmItem
+from parameters import ParametersStore, apply_ezpro_parameters, read_alarm_items, merge_alarm_items, apply_switches_parameters, apply_logging_parameters, apply_sampling_parameters, LOGGING_PERIODS
 import time
 from threading import Thread
-from ezpronotification import EZProNotification
+import queue
+from ezproserver import EZProServer
+from log_rotation import DailyFileHandler, shared_retention
+from log_writer import shared_writer
+from trend_chart import TrendChart
 import platform
 import sys
-import xml.etree.ElementTree as ET
 import logging
 import os
 
@@ -16,15 +20,17 @@ class Program:
     def __init__(self, root):
         self.root = root
         self.setup_logger()
-        self.hardwaremonitor = HardwareMonitor_Linux()
+        self.hardwaremonitor = HardwareMonitor_Linux(variable_factory=IntVar)
+        self.parameters = ParametersStore(logger=self.logger_main)  # parameters.xml 只解析一次
+        self.ezpro_status_code = None  # 選單上顯示的 EZPro 連線狀態
         self.setup_ui()
-        self.read_ezpro_parameters()
-        self.read_alarm_items_parameters()
-        self.read_switches_parameters()
-        self.read_logging_parameters()
+        self.read_parameters()
+        self.parameters_checked_at = time.monotonic()
         self.isRunning = False
         self.monitor_thread = None
-        self.update_thread = None
+        self.update_after_id = None
+        self.displayed_rows = {}  # 目前顯示的內容 {row key: (type, usage, temperature)}
+        self.hardwaremonitor.snapshot_queue = queue.Queue(maxsize=2)
         self.start_monitoring()
 
     # 設置 logger
@@ -32,24 +38,31 @@ class Program:
         try:
             self.logger_main = logging.getLogger('MAIN')
             self.logger_main.setLevel(logging.INFO)
-            self.filehandler = logging.FileHandler(f'main_{time.strftime("%Y%m%d")}.log')
+            self.filehandler = DailyFileHandler('main', shared_retention)
             self.filehandler.setLevel(logging.INFO)
             self.formatter = logging.Formatter('%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
             self.filehandler.setFormatter(self.formatter)
-            self.logger_main.addHandler(self.filehandler)
+            self.queuehandler = shared_writer.handler_for(self.filehandler)  # 由背景執行緒累積後寫入
+            self.logger_main.addHandler(self.queuehandler)
             print('setup logger_main success')
         except Exception as e:
             print(f'setup logger_main error: {e}')
 
-    # 更新 treeview 顯示資料
-    def update_treeview(self):
+    # 更新 treeview 顯示資料: 只更新數值有變動的欄位
+    def update_treeview(self, snapshot: dict):
         try:
-            self.treeview_overview.item(self.row_cpu, values=['CPU', f"{self.hardwaremonitor.cpu.usage}%", f"{self.hardwaremonitor.cpu.temperature}C"])
-            self.treeview_overview.item(self.row_ram, values=['RAM', f"{self.hardwaremonitor.ram.usage}%", "-"])
-            self.treeview_overview.item(self.row_gpu, values=['GPU', f"{self.hardwaremonitor.gpu.usage}%", f"{self.hardwaremonitor.gpu.temperature}C"])
-            for drive in self.hardwaremonitor.drives:
-                driveInfo = self.hardwaremonitor.drives[drive]
-                self.treeview_overview.item(self.row_drives[driveInfo.name], values=[f'{driveInfo.name}', f"{driveInfo.usage}%", f"{driveInfo.temperature}C"])
+            columns = self.treeview_overview['columns']
+            for key, values in snapshot.items():
+                row = self.rows_overview.get(key) or self.row_drives.get(key)
+                if row is None:
+                    continue
+                displayed = self.displayed_rows.get(key)
+                if displayed == values:
+                    continue
+                for index, value in enumerate(values):
+                    if displayed is None or displayed[index] != value:
+                        self.treeview_overview.set(row, columns[index], value)
+                self.displayed_rows[key] = values
         except Exception as e:
             print(f"update treeview fail -> {e}")
     
@@ -57,55 +70,62 @@ class Program:
     def start_monitoring(self):
         self.isRunning = True
         self.hardwaremonitor.isRunning = True
-        if not self.monitor_thread and not self.update_thread:
+        if not self.monitor_thread:
             self.monitor_thread = Thread(target=self.hardwaremonitor.start_monitor)
             self.monitor_thread.start()
-            self.update_thread = Thread(target=self.update_data)
-            self.update_thread.start()
+            self.update_after_id = self.root.after(200, self.update_data)
 
-    # 更新資料
+    # 更新資料 (在 Tk 主執行緒以 after() 執行): 取出佇列中最新的快照
     def update_data(self):
-        while self.isRunning:
-            self.update_treeview()
-            time.sleep(1)  
+        snapshot = None
+        while True:
+            try:
+                snapshot = self.hardwaremonitor.snapshot_queue.get_nowait()
+            except queue.Empty:
+                break
+        if snapshot is not None:
+            self.update_treeview(snapshot)
+            if self.window_trend.state() != 'withdrawn':
+                self.trend_chart.update()
+        # parameters.xml 被外部修改 (例如集中管理推送) 時重新套用
+        now = time.monotonic()
+        if now - self.parameters_checked_at >= self.parameters.poll_interval:
+            self.parameters_checked_at = now
+            if self.parameters.check_reload():
+                self.read_parameters()
+        # EZPro 連線狀態 (背景檢查的快取結果) 變動時更新選單
+        status = self.hardwaremonitor.ezpro_health.status()
+        if (status and status.code) != self.ezpro_status_code:
+            self.update_ezpro_server_name_label()
+        if self.isRunning:
+            self.update_after_id = self.root.after(200, self.update_data)
 
     # 讀取 EZPro 相關參數設定 
     def read_ezpro_parameters(self):
-        try:
-            tree = ET.parse('parameters.xml')
-            root = tree.getroot()
-        except FileNotFoundError:
+        root = self.parameters.root
+        if root is None:
             self.logger_main.error("read ezpro parameters error: file not found")  
             return
 
-        if root.find('EZPro_IP') is not None:
-            self.hardwaremonitor.ezpro.ip = root.find('EZPro_IP').text
-        if root.find('EZPro_Port') is not None:
-            self.hardwaremonitor.ezpro.port = root.find('EZPro_Port').text
-        if root.find('EZPro_Username') is not None:
-            self.hardwaremonitor.ezpro.username = root.find('EZPro_Username').text
-        if root.find('EZPro_Password') is not None:
-            self.hardwaremonitor.ezpro.password = root.find('EZPro_Password').text  
+        apply_ezpro_parameters(root, self.hardwaremonitor)
+        self.hardwaremonitor.ezpro_health.request_check()
 
         self.update_ezpro_server_name_label()
 
         self.logger_main.info('read ezpro parameters finished')
 
-    # 讀取 通報項目 相關參數設定-1
+    # 讀取 通報項目 相關參數設定-1 (重新載入時內容相同的項目沿用原本的物件, 保留通報狀態)
     def read_alarm_items_parameters(self):
         try:
-            try:
-                tree = ET.parse('parameters.xml')
-                root = tree.getroot()
-            except FileNotFoundError:
+            root = self.parameters.root
+            if root is None:
                 self.logger_main.error("read alarm item parameters error: file not found") 
                 return
 
-            alarmItems = root.findall('AlarmItem')
-            if len(alarmItems) > 0:
-                for item in alarmItems:
-                    self.hardwaremonitor.notification_items.append(AlarmItem(item.get('name'), item.get('target'), item.get('threshold')))
-                    self.treeview_notify_items.insert(parent='', index='end', values=[item.get('name'), item.get('target'), item.get('threshold')])
+            self.hardwaremonitor.notification_items = merge_alarm_items(self.hardwaremonitor.notification_items, read_alarm_items(root))
+            self.treeview_notify_items.delete(*self.treeview_notify_items.get_children())
+            for alarmItem in self.hardwaremonitor.notification_items:
+                self.treeview_notify_items.insert(parent='', index='end', values=[alarmItem.name, alarmItem.target, alarmItem.threshold])
 
             self.logger_main.info('read alarm item parameters finished')
         except Exception as e:
@@ -114,17 +134,12 @@ class Program:
     # 讀取 通報項目 相關參數設定-2
     def read_switches_parameters(self):
         try:
-            try:
-                tree = ET.parse('parameters.xml')
-                root = tree.getroot()
-            except FileNotFoundError:
+            root = self.parameters.root
+            if root is None:
                 self.logger_main.error('read switches parameters error: file not found')
                 return
             
-            if root.find('Enable_NotifyToEZPro') is not None:
-                self.hardwaremonitor.enableNotifyToEzPro.set(int(root.find('Enable_NotifyToEZPro').text))
-            if root.find('Enable_LoggingNotification') is not None:
-                self.hardwaremonitor.enableLoggingNotification.set(int(root.find('Enable_LoggingNotification').text))
+            apply_switches_parameters(root, self.hardwaremonitor)
         
             self.logger_main.info('read switches parameters finished')
         except Exception as e:
@@ -133,53 +148,42 @@ class Program:
     
     # 讀取 Logging 相關參數設定
     def read_logging_parameters(self):
-        try:
-            tree = ET.parse('parameters.xml')
-            root = tree.getroot()
-        except FileNotFoundError:
+        root = self.parameters.root
+        if root is None:
             self.logger_main.error("read logging parameters error: file not found")
             return
 
-        logging_period = root.find('Logging_Period')
-        if logging_period is not None and logging_period.text in self.option_logging_periods:
-            self.hardwaremonitor.logging_period = root.find('Logging_Period').text
-        else:
-            self.logger_main.error(f'read logging parameters error: invalid data')
+        apply_logging_parameters(root, self.hardwaremonitor, self.logger_main)
         
         self.logger_main.info('read logging parameters finished')
 
-    # 儲存 EZPro 相關參數設定 
-    def save_ezpro_parameters(self):
-        try:
-            try:
-                tree = ET.parse('parameters.xml')
-                root = tree.getroot()  
-            except FileNotFoundError:
-                self.logger_main.error("parameters.xml not found, creating new one.")
-                root = ET.Element('parameters')
-                tree = ET.ElementTree(root)
-
-            if root.find('EZPro_IP') is not None:
-                root.find('EZPro_IP').text = self.hardwaremonitor.ezpro.ip
-            else:
-                ET.SubElement(root, 'EZPro_IP').text = self.hardwaremonitor.ezpro.ip 
+    # 讀取 取樣 相關參數設定
+    def read_sampling_parameters(self):
+        root = self.parameters.root
+        if root is None:
+            self.logger_main.error("read sampling parameters error: file not found")
+            return
 
-            if root.find('EZPro_Port') is not None:
-                root.find('EZPro_Port').text = self.hardwaremonitor.ezpro.port
-            else:
-                ET.SubElement(root, 'EZPro_Port').text = self.hardwaremonitor.ezpro.port
+        apply_sampling_parameters(root, self.hardwaremonitor, self.logger_main)
 
-            if root.find('EZPro_Username') is not None:
-                root.find('EZPro_Username').text = self.hardwaremonitor.ezpro.username
-            else:
-                ET.SubElement(root, 'EZPro_Username').text = self.hardwaremonitor.ezpro.username
+        self.logger_main.info('read sampling parameters finished')
 
-            if root.find('EZPro_Password') is not None:
-                root.find('EZPro_Password').text = self.hardwaremonitor.ezpro.password
-            else:
-                ET.SubElement(root, 'EZPro_Password').text = self.hardwaremonitor.ezpro.password
+    # 讀取所有參數設定 (啟動時, 以及 parameters.xml 被外部修改後)
+    def read_parameters(self):
+        self.read_ezpro_parameters()
+        self.read_alarm_items_parameters()
+        self.read_switches_parameters()
+        self.read_logging_parameters()
+        self.read_sampling_parameters()
 
-            tree.write('parameters.xml', encoding='utf-8', xml_declaration=True)
+    # 儲存 EZPro 相關參數設定 (合併為一次寫入)
+    def save_ezpro_parameters(self):
+        try:
+            self.parameters.set_text('EZPro_IP', self.hardwaremonitor.ezpro.ip)
+            self.parameters.set_text('EZPro_Port', self.hardwaremonitor.ezpro.port)
+            self.parameters.set_text('EZPro_Username', self.hardwaremonitor.ezpro.username)
+            self.parameters.set_text('EZPro_Password', self.hardwaremonitor.ezpro.password)
+            self.parameters.save()
             self.logger_main.info("save ezpro parameters success")
 
         except Exception as e:
@@ -188,61 +192,19 @@ class Program:
     # 儲存 通報項目 相關參數設定-1 
     def save_alarm_items_parameters(self):
         try:
-            try:
-                tree = ET.parse('parameters.xml')
-                root = tree.getroot()  
-            except FileNotFoundError:
-                self.logger_main.error("parameters.xml not found, creating new one.")
-                root = ET.Element('parameters')
-                tree = ET.ElementTree(root)
-
-
-            notification_keys = {f"{item.name}_{item.target}_{item.threshold}" for item in self.hardwaremonitor.notification_items}
-
-            # 移除
-            items_to_remove = [item for item in root.findall('AlarmItem') if f"{item.get('name')}_{item.get('target')}_{item.get('threshold')}" not in notification_keys]
-            for item in items_to_remove:
-                root.remove(item)
-
-            existing_items = {f"{item.get('name')}_{item.get('target')}_{item.get('threshold')}": item for item in root.findall('AlarmItem')}
-
-            # 新增
-            for item in self.hardwaremonitor.notification_items:
-                item_key = f"{item.name}_{item.target}_{item.threshold}"
-                if item_key not in existing_items:
-                    node = ET.SubElement(root, 'AlarmItem')
-                    node.set('name', item.name)
-                    node.set('target', item.target)
-                    node.set('threshold', item.threshold)
-
-            tree.write('parameters.xml', encoding='utf-8', xml_declaration=True)
+            self.parameters.set_alarm_items(self.hardwaremonitor.notification_items)
+            self.parameters.save()
             self.logger_main.info("save alarm items success")
 
         except Exception as e:
-            self.logger_main.error("save alarm items error: {e}")
+            self.logger_main.error(f"save alarm items error: {e}")
 
     # 儲存 通報項目 相關參數設定-2
     def save_switches_parameters(self):
         try:
-            try:
-                tree = ET.parse('parameters.xml')
-                root = tree.getroot()  
-            except FileNotFoundError:
-                self.logger_main.error("parameters.xml not found, creating new one.")
-                root = ET.Element('parameters')
-                tree = ET.ElementTree(root)
-
-            if root.find('Enable_NotifyToEZPro') is not None:
-                root.find('Enable_NotifyToEZPro').text = str(self.hardwaremonitor.enableNotifyToEzPro.get())
-            else:
-                ET.SubElement(root, 'Enable_NotifyToEZPro').text = str(self.hardwaremonitor.enableNotifyToEzPro.get())
-
-            if root.find('Enable_LoggingNotification') is not None:
-                root.find('Enable_LoggingNotification').text = str(self.hardwaremonitor.enableLoggingNotification.get())
-            else:
-                ET.SubElement(root, 'Enable_LoggingNotification').text = str(self.hardwaremonitor.enableLoggingNotification.get())
-
-            tree.write('parameters.xml', encoding='utf-8', xml_declaration=True)
+            self.parameters.set_text('Enable_NotifyToEZPro', str(self.hardwaremonitor.enableNotifyToEzPro.get()))
+            self.parameters.set_text('Enable_LoggingNotification', str(self.hardwaremonitor.enableLoggingNotification.get()))
+            self.parameters.save()
             self.logger_main.info("save switches success")
         except Exception as e:
             self.logger_main.error(f'save switches parameters error: {e}')
@@ -250,24 +212,12 @@ class Program:
     # 儲存 Logging 相關參數設定
     def save_logging_parameters(self):
         try:
-            try:
-                tree = ET.parse('parameters.xml')
-                root = tree.getroot()  
-            except FileNotFoundError:
-                self.logger_main.error("parameters.xml not found, creating new one.")
-                root = ET.Element('parameters')
-                tree = ET.ElementTree(root)
-            
-            if root.find('Logging_Period') is not None:
-                root.find('Logging_Period').text = self.hardwaremonitor.logging_period
-            else:
-                ET.SubElement(root, 'Logging_Period').text = self.hardwaremonitor.logging_period 
-
-            tree.write('parameters.xml', encoding='utf-8', xml_declaration=True)
+            self.parameters.set_text('Logging_Period', self.hardwaremonitor.logging_period)
+            self.parameters.save()
             self.logger_main.info("save logging parameters success")
 
         except Exception as e:
-            self.logger_main.error("save logging parameters error: {e}")
+            self.logger_main.error(f"save logging parameters error: {e}")
 
     # 介面佈局、控件事件綁定
     def setup_ui(self):
@@ -318,6 +268,7 @@ class Program:
         # 填入 gpu 項目
         data_gpu = [f"GPU", "-", "-"]
         self.row_gpu = self.treeview_overview.insert(parent='', index='end', values=data_gpu)
+        self.rows_overview = {'CPU': self.row_cpu, 'RAM': self.row_ram, 'GPU': self.row_gpu}
             
         # 填入 drive 項目    
         partitions = self.hardwaremonitor.get_devices()
@@ -335,6 +286,9 @@ class Program:
         self.menu_settings.add_command(label="EZPro設定", command=self.show_ezpro_server_window)
         self.menu_settings.add_command(label="通報設定", command=self.show_notification_window)
         self.menu_settings.add_command(label="Log輸出設定", command=self.show_logging_period_window)
+        self.menu_view = Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="檢視", menu=self.menu_view)
+        self.menu_view.add_command(label="趨勢圖", command=self.show_trend_window)
         self.update_ezpro_server_name_label()
         
         self.window_setup_ezpro_server = Toplevel(self.root)
@@ -456,7 +410,7 @@ class Program:
         self.window_setup_logging_period.protocol("WM_DELETE_WINDOW", self.close_logging_period)
         self.label_logging_period_introduce = Label(self.window_setup_logging_period, text="Logging Period(Minute):")
         self.label_logging_period_introduce.grid(row=0, column=0)
-        self.option_logging_periods = ["10", "30", "60"]
+        self.option_logging_periods = LOGGING_PERIODS
         self.combo_logging_period = ttk.Combobox(self.window_setup_logging_period, values=self.option_logging_periods, state='readonly')
         self.combo_logging_period.grid(row=0, column=1)
         self.combo_logging_period.bind('<<ComboboxSelected>>', self.on_combobox_change)
@@ -471,9 +425,20 @@ class Program:
         window_setup_logging_period_y = (self.window_setup_logging_period.winfo_screenheight() - self.window_setup_logging_period.winfo_height()) // 2
         self.window_setup_logging_period.geometry(f'+{window_setup_logging_period_x}+{window_setup_logging_period_y}')
 
+        # 趨勢圖 (資料來自 hardwaremonitor.history)
+        self.window_trend = Toplevel(self.root)
+        self.window_trend.withdraw()
+        self.window_trend.title("趨勢圖")
+        self.window_trend.protocol("WM_DELETE_WINDOW", self.close_trend)
+        self.trend_chart = TrendChart(self.window_trend, self.hardwaremonitor.history)
+        self.trend_chart.canvas.pack(fill='both', expand=True)
+
     def update_ezpro_server_name_label(self):
+        status = self.hardwaremonitor.ezpro_health.status()
+        self.ezpro_status_code = status and status.code
         if self.hardwaremonitor.ezpro.ip is not None:
-            self.menu_settings.entryconfig(index=0, label=f"EZPro設定 - {self.hardwaremonitor.ezpro.ip}")
+            state = "" if status is None else " (已連線)" if status.code == '3' else " (無法連線)" if status.code == '2' else " (連線失敗)"
+            self.menu_settings.entryconfig(index=0, label=f"EZPro設定 - {self.hardwaremonitor.ezpro.ip}{state}")
         else:
             self.menu_settings.entryconfig(index=0, label="EZPro設定")
 
@@ -484,11 +449,25 @@ class Program:
             self.hardwaremonitor.ezpro.username = self.entry_ezpro_username.get()
             self.hardwaremonitor.ezpro.password = self.entry_ezpro_password.get()
             self.logger_main.info(f"setup ezpro server => ip:{self.hardwaremonitor.ezpro.ip}, port:{self.hardwaremonitor.ezpro.port}, username:{self.hardwaremonitor.ezpro.username}, password:{self.hardwaremonitor.ezpro.password}")
+            self.hardwaremonitor.ezpro_health.request_check()
         except Exception as e:
             self.logger_main.error(f"setup ezpro server error: {e}")
 
+    # 連線測試在背景執行緒進行, 完成後由 after() 顯示結果, 不會卡住畫面
     def test_ezpro_server_connection(self):
-        result = EZProNotification.test_ezpro_server_connection(self.entry_ezpro_server_IP.get(), self.entry_ezpro_server_Port.get(), self.entry_ezpro_username.get(), self.entry_ezpro_password.get())
+        ezpro = EZProServer(self.entry_ezpro_server_IP.get(), self.entry_ezpro_server_Port.get(), self.entry_ezpro_username.get(), self.entry_ezpro_password.get())
+        self.btn_ezpro_connect.config(state=DISABLED, text="Testing...")
+        result_queue = queue.Queue(maxsize=1)
+        Thread(target=lambda: result_queue.put(self.hardwaremonitor.ezpro_health.check(ezpro)), name='ezpro-test', daemon=True).start()
+        self.root.after(100, self.show_ezpro_connection_result, result_queue)
+
+    def show_ezpro_connection_result(self, result_queue: queue.Queue):
+        try:
+            result = result_queue.get_nowait().code
+        except queue.Empty:
+            self.root.after(100, self.show_ezpro_connection_result, result_queue)
+            return
+        self.btn_ezpro_connect.config(state=NORMAL, text="Connect")
         if result == '1':
             messagebox.showerror("ERROR", "內容輸入錯誤", parent=self.window_setup_ezpro_server)
             return
@@ -649,6 +628,17 @@ class Program:
             self.window_setup_logging_period.lift()
             self.window_setup_logging_period.focus()
 
+    def show_trend_window(self):
+        if self.window_trend.state() == 'withdrawn':
+            self.trend_chart.rebuild()
+            self.window_trend.deiconify()
+        else:
+            self.window_trend.lift()
+            self.window_trend.focus()
+
+    def close_trend(self):
+        self.window_trend.withdraw()
+
     def close_ezpro_server(self):
         self.window_setup_ezpro_server.withdraw()
         self.entry_ezpro_server_IP.delete('0', 'end')
@@ -676,8 +666,10 @@ class Program:
         self.isRunning = False
         if self.isRunning == False:
             self.hardwaremonitor.stop_monitor()
+            self.parameters.stop()  # 寫入尚未寫入的變更
+            if self.update_after_id is not None:
+                self.root.after_cancel(self.update_after_id)
             self.monitor_thread.join()
-            self.update_thread.join()
             self.root.destroy()
 
 def check_if_platform_is_windows() -> bool:
@@ -686,12 +678,16 @@ def check_if_platform_is_windows() -> bool:
     else:
         return False
 
-if (check_if_platform_is_windows()):
-    messagebox.showerror("Error", "This application is not support on Windows platform.")
-    sys.exit()
+# 啟動 GUI
+def main():
+    if (check_if_platform_is_windows()):
+        messagebox.showerror("Error", "This application is not support on Windows platform.")
+        sys.exit()
+
+    root = Tk()
+    app = Program(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_closing)
+    root.mainloop()
 
-# Usage
-root = Tk()
-app = Program(root)
-root.protocol("WM_DELETE_WINDOW", app.on_closing)
-root.mainloop()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
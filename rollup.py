@@ -0,0 +1,174 @@
+import math
+import threading
+from array import array
+from sample_history import RingBuffer
+
+# p95 以固定區間的直方圖估計 (每 1 單位一格), 可直接相加合併到下一層
+HISTOGRAM_MIN = -50
+HISTOGRAM_MAX = 150
+HISTOGRAM_BINS = HISTOGRAM_MAX - HISTOGRAM_MIN + 1
+_EMPTY_HISTOGRAM = array('I', [0]) * HISTOGRAM_BINS
+
+# 預設層級: (名稱, 每格秒數, 保留格數) -> 1min x 24h, 15min x 7d, 1h x 30d (1s 資料由 SampleHistory 保存)
+DEFAULT_TIERS = [('1min', 60, 1440), ('15min', 900, 672), ('1h', 3600, 720)]
+
+
+# 一段時間內的統計: min / avg / max / p95
+class RollupBucket:
+    __slots__ = ('count', 'total', 'min', 'max', 'histogram')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.histogram = array('I', _EMPTY_HISTOGRAM)
+
+    def add(self, value):
+        if value != value:  # NaN
+            return
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        index = int(value) - HISTOGRAM_MIN
+        self.histogram[0 if index < 0 else HISTOGRAM_BINS - 1 if index >= HISTOGRAM_BINS else index] += 1
+
+    # 合併下一層的 bucket (每格只在結束時執行一次)
+    def merge(self, other: 'RollupBucket'):
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        histogram = self.histogram
+        for index, count in enumerate(other.histogram):
+            if count:
+                histogram[index] += count
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.histogram[:] = _EMPTY_HISTOGRAM
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    @property
+    def p95(self) -> float:
+        if self.count == 0:
+            return math.nan
+        rank = math.ceil(self.count * 0.95)
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                return min(max(index + HISTOGRAM_MIN, self.min), self.max)
+        return self.max
+
+    # (min, avg, max, p95), 沒有資料時為 None
+    def summary(self):
+        if self.count == 0:
+            return None
+        return (self.min, round(self.avg, 1), self.max, self.p95)
+
+
+# 單一層級: 每個序列一個進行中的 bucket, 結束的 bucket 寫入環狀緩衝區
+class RollupTier:
+
+    def __init__(self, name: str, period: int, capacity: int) -> None:
+        self.name = name
+        self.period = period
+        self.capacity = capacity
+        self.slot = None  # 目前 bucket 的時間格 (timestamp // period)
+        self.timestamps = RingBuffer(capacity, 'd')  # 每格的起始時間
+        self.current = {}  # {name: RollupBucket}
+        self.rings = {}    # {name: (min, avg, max, p95) RingBuffer}
+
+    def bucket(self, name: str) -> RollupBucket:
+        bucket = self.current.get(name)
+        if bucket is None:
+            bucket = RollupBucket()
+            self.current[name] = bucket
+            self.rings[name] = tuple(RingBuffer(self.capacity, 'f', self.timestamps.index, self.timestamps.count) for _ in range(4))
+        return bucket
+
+    # 結束目前的時間格, 回傳已結束的 bucket 供下一層合併
+    def close(self, next_tier: 'RollupTier' = None):
+        self.timestamps.append(self.slot * self.period)
+        for name, bucket in self.current.items():
+            summary = bucket.summary() or (math.nan, math.nan, math.nan, math.nan)
+            for ring, value in zip(self.rings[name], summary):
+                ring.append(value)
+            if next_tier is not None:
+                next_tier.bucket(name).merge(bucket)
+            bucket.reset()
+
+
+# 多層級的串流統計, 每筆樣本 O(1)
+class MetricRollups:
+
+    def __init__(self, tiers: list = None) -> None:
+        self.tiers = [RollupTier(name, period, capacity) for name, period, capacity in (tiers or DEFAULT_TIERS)]
+        self.period_buckets = {}  # 定期 log 用, 自上次 take_period_summary() 之後的統計
+        self.lock = threading.Lock()
+
+    def add(self, name: str, value):
+        self.tiers[0].bucket(name).add(value)
+        bucket = self.period_buckets.get(name)
+        if bucket is None:
+            bucket = RollupBucket()
+            self.period_buckets[name] = bucket
+        bucket.add(value)
+
+    # 在新增該時間點的數值之前呼叫, 跨過時間格時逐層結束 bucket
+    def advance(self, timestamp: float):
+        with self.lock:
+            for index, tier in enumerate(self.tiers):
+                slot = int(timestamp // tier.period)
+                if tier.slot is None:
+                    tier.slot = slot
+                    continue
+                if slot == tier.slot:
+                    break
+                tier.close(self.tiers[index + 1] if index + 1 < len(self.tiers) else None)
+                tier.slot = slot
+
+    # 記錄目前監控數值 (與 SampleHistory 相同的序列)
+    def record(self, timestamp: float, monitor):
+        self.advance(timestamp)
+        self.add('cpu.usage', monitor.cpu.usage)
+        self.add('cpu.temperature', monitor.cpu.temperature)
+        self.add('ram.usage', monitor.ram.usage)
+        self.add('gpu.usage', monitor.gpu.usage)
+        self.add('gpu.temperature', monitor.gpu.temperature)
+        for driveInfo in monitor.drives.values():
+            self.add(f'drive.{driveInfo.name}.usage', driveInfo.usage)
+            self.add(f'drive.{driveInfo.name}.temperature', driveInfo.temperature)
+
+    # 取出上次呼叫之後的統計並重新開始: {name: (min, avg, max, p95)}
+    def take_period_summary(self) -> dict:
+        summaries = {}
+        for name, bucket in self.period_buckets.items():
+            summary = bucket.summary()
+            if summary is not None:
+                summaries[name] = summary
+            bucket.reset()
+        return summaries
+
+    # 查詢某一層最近 count 格: (timestamps, min, avg, max, p95), 各為 list
+    def query(self, tier_name: str, name: str, count: int = None):
+        with self.lock:
+            for tier in self.tiers:
+                if tier.name == tier_name:
+                    rings = tier.rings.get(name)
+                    if rings is None:
+                        return None
+                    return (tier.timestamps.to_list(count),) + tuple(ring.to_list(count) for ring in rings)
+        return None
@@ -0,0 +1,120 @@
+import bisect
+import math
+import threading
+from array import array
+
+NAN = math.nan
+
+
+# 固定大小的環狀緩衝區, 建立時一次配置, append 為 O(1)
+class RingBuffer:
+
+    def __init__(self, capacity: int, typecode: str = 'f', index: int = 0, count: int = 0) -> None:
+        self.capacity = capacity
+        self.data = array(typecode, [NAN]) * capacity
+        self.view = memoryview(self.data)
+        self.index = index  # 下一筆寫入的位置
+        self.count = count  # 目前的筆數 (<= capacity)
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    # 最近 count 筆資料 (由舊到新), 回傳 0 ~ 2 個 memoryview, 不複製資料
+    def window(self, count: int = None) -> tuple:
+        count = self.count if count is None else min(count, self.count)
+        if count == 0:
+            return ()
+        start = (self.index - count) % self.capacity
+        if start < self.index:
+            return (self.view[start:self.index],)
+        return (self.view[start:], self.view[:self.index]) if self.index > 0 else (self.view[start:],)
+
+    def latest(self):
+        if self.count == 0:
+            return None
+        return self.data[(self.index - 1) % self.capacity]
+
+    def to_list(self, count: int = None) -> list:
+        result = []
+        for segment in self.window(count):
+            result.extend(segment)
+        return result
+
+
+# 最近樣本的時間序列 (預設 24 小時 @ 1Hz), 所有序列共用同一個時間軸
+class SampleHistory:
+
+    def __init__(self, capacity: int = 86400) -> None:
+        self.capacity = capacity
+        self.timestamps = RingBuffer(capacity, 'd')  # epoch 秒
+        self.series = {}  # {name: RingBuffer}
+        self.drive_series = {}  # {drive name: (usage RingBuffer, temperature RingBuffer)}
+        self.lock = threading.Lock()  # 只保護新增序列, append / window 不需要鎖
+        for name in ['cpu.usage', 'cpu.temperature', 'ram.usage', 'gpu.usage', 'gpu.temperature']:
+            self.add_series(name)
+
+    # 新增序列 (例如第一次出現的硬碟), 之前的時間點為 NaN
+    def add_series(self, name: str) -> RingBuffer:
+        with self.lock:
+            ring = self.series.get(name)
+            if ring is None:
+                ring = RingBuffer(self.capacity, 'f', self.timestamps.index, self.timestamps.count)
+                self.series[name] = ring
+            return ring
+
+    # 記錄目前監控數值
+    def record(self, timestamp: float, monitor):
+        series = self.series
+        series['cpu.usage'].append(monitor.cpu.usage)
+        series['cpu.temperature'].append(monitor.cpu.temperature)
+        series['ram.usage'].append(monitor.ram.usage)
+        series['gpu.usage'].append(monitor.gpu.usage)
+        series['gpu.temperature'].append(monitor.gpu.temperature)
+        updated = 5
+        for driveInfo in monitor.drives.values():
+            rings = self.drive_series.get(driveInfo.name)
+            if rings is None:
+                rings = (self.add_series(f'drive.{driveInfo.name}.usage'), self.add_series(f'drive.{driveInfo.name}.temperature'))
+                self.drive_series[driveInfo.name] = rings
+            usage, temperature = rings
+            usage.append(driveInfo.usage)
+            temperature.append(driveInfo.temperature)
+            updated += 2
+        if updated < len(series):
+            for ring in series.values():
+                if ring.index == self.timestamps.index:  # 這次沒有資料的序列 (例如已移除的硬碟)
+                    ring.append(NAN)
+        self.timestamps.append(timestamp)
+
+    # 最近 count 筆 (timestamps, values), 各為 memoryview 片段的 tuple
+    def window(self, name: str, count: int = None) -> tuple:
+        ring = self.series.get(name)
+        if ring is None:
+            return (), ()
+        return self.timestamps.window(count), ring.window(count)
+
+    # 最近 seconds 秒內的筆數
+    def count_since(self, seconds: float) -> int:
+        latest = self.timestamps.latest()
+        if latest is None:
+            return 0
+        count = 0
+        for segment in self.timestamps.window():
+            count += len(segment) - bisect.bisect_left(segment, latest - seconds)
+        return count
+
+    # timestamp 之後的筆數 (增量繪圖用)
+    def count_after(self, timestamp: float) -> int:
+        if timestamp is None:
+            return self.timestamps.count
+        count = 0
+        for segment in self.timestamps.window():
+            count += len(segment) - bisect.bisect_right(segment, timestamp)
+        return count
+
+    def names(self) -> list:
+        with self.lock:
+            return list(self.series)
@@ -0,0 +1,28 @@
+# 自動調整取樣間隔: 接近通報門檻時加快, 系統閒置時放慢, 其餘使用一般間隔
+class AdaptiveRate:
+
+    def __init__(self, interval: float = 1.0, fast_interval: float = 0.1, idle_interval: float = 5.0, idle_usage: float = 10, idle_after: float = 60, fast_hold: float = 10) -> None:
+        self.interval = interval            # 一般間隔 (秒)
+        self.fast_interval = fast_interval  # 接近門檻時的間隔
+        self.idle_interval = idle_interval  # 閒置時的間隔
+        self.idle_usage = idle_usage        # cpu / gpu 使用率都低於此值視為閒置 (%)
+        self.idle_after = idle_after        # 持續閒置多久才放慢 (秒)
+        self.fast_hold = fast_hold          # 離開門檻附近後維持快速取樣的時間, 避免頻繁切換 (秒)
+        self.idle_since = None
+        self.near_until = None
+
+    # 依最新的監控數值決定下一次的取樣間隔; near: 通報規則是否接近門檻
+    def next_interval(self, monitor, near: bool, now: float) -> float:
+        if near:
+            self.near_until = now + self.fast_hold
+        if self.near_until is not None and now < self.near_until:
+            self.idle_since = None
+            return self.fast_interval
+        if monitor.cpu.usage < self.idle_usage and monitor.gpu.usage < self.idle_usage:
+            if self.idle_since is None:
+                self.idle_since = now
+            if now - self.idle_since >= self.idle_after:
+                return self.idle_interval
+        else:
+            self.idle_since = None
+        return self.interval
@@ -0,0 +1,208 @@
+import subprocess
+import threading
+import time
+import logging
+from tegrastats_parser import TegrastatsParser, TegrastatsSample
+from sysfs_collector import SysfsCollector
+
+
+class Sampler:
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.exhausted = False  # 來源已結束 (replay 讀到檔尾 / tegrastats 結束)
+        self.interval = interval  # 取樣間隔 (秒)
+
+    def start(self):
+        pass
+
+    # 變更取樣間隔 (adaptive 取樣使用)
+    def set_interval(self, interval: float):
+        self.interval = interval
+
+    # 取得下一筆樣本, 無法解析時回傳 None
+    def read(self):
+        raise NotImplementedError
+
+    # 要求停止 (signal handler 呼叫): 只設定旗標, 不關閉檔案 / 程序
+    def request_stop(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+# 即時 tegrastats 輸出: 由 tegrastats --interval 決定取樣時間, 讀取端不另外等待, 不會累積過時的資料
+class TegrastatsSampler(Sampler):
+
+    def __init__(self, command=None, interval: float = 1.0, max_restarts: int = 5, backoff: float = 1.0, logger: logging.Logger = None) -> None:
+        super().__init__(interval)
+        self.command = command or ['tegrastats']
+        self.parser = TegrastatsParser()
+        self.process = None
+        self.stopped = False
+        self.max_restarts = max_restarts  # tegrastats 連續幾次結束仍無法恢復時放棄 (raise)
+        self.backoff = backoff            # 第 n 次重新啟動前等待 backoff * 2^(n-1) 秒
+        self.restarts = 0                 # 連續重新啟動次數, 讀到資料後歸零
+        self.stop_event = threading.Event()
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+
+    def start(self):
+        if self.process is None:
+            self.process = subprocess.Popen(self.command + ['--interval', str(max(int(self.interval * 1000), 1))], stdout=subprocess.PIPE, text=True)
+
+    # 間隔變更時以新的 --interval 重新啟動 tegrastats
+    def set_interval(self, interval: float):
+        if interval == self.interval:
+            return
+        self.interval = interval
+        if self.process is not None and not self.stopped:
+            self.process.terminate()
+            self.process.wait()
+            self.process = None
+            self.start()
+
+    # tegrastats 結束 (或關閉 pipe) 不是正常結束: 重新啟動, 只有 stop() 之後才 exhausted
+    def read(self):
+        while not self.stopped:
+            try:
+                self.start()
+            except OSError as e:
+                self.restart(f'{e}')
+                continue
+            output_line = self.process.stdout.readline()
+            if output_line != '':
+                self.restarts = 0
+                return self.parser.parse(output_line)
+            if self.stopped:
+                break
+            self.restart(f'exit code {self.close_process()}')
+        self.exhausted = True
+        return None
+
+    # 依 backoff 等待後再啟動, 連續失敗超過 max_restarts 次時 raise (daemon 以非 0 結束, 由 systemd 重新啟動)
+    def restart(self, reason: str):
+        self.restarts += 1
+        if self.restarts > self.max_restarts:
+            raise RuntimeError(f'tegrastats stopped {self.restarts} times in a row ({reason})')
+        delay = self.backoff * 2 ** (self.restarts - 1)
+        self.logger.error(f'tegrastats stopped ({reason}), restart in {delay:.0f}s ({self.restarts}/{self.max_restarts})')
+        self.stop_event.wait(delay)
+
+    def close_process(self):
+        process = self.process
+        self.process = None
+        if process is None:
+            return None
+        if process.poll() is None:
+            process.terminate()
+        process.wait()
+        process.stdout.close()
+        return process.returncode
+
+    def request_stop(self):
+        self.stopped = True
+        self.stop_event.set()
+
+    def stop(self):
+        self.request_stop()
+        process = self.process
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+# 重播錄製的 tegrastats log (一般檔案或 FIFO)
+class ReplaySampler(Sampler):
+
+    def __init__(self, path: str, speed: float = 1.0, repeat: int = 1, interval: float = 1.0, logger: logging.Logger = None) -> None:
+        super().__init__(interval)  # interval: log 沒有時間戳記時, 每行的間隔 (秒)
+        self.path = path
+        self.speed = speed        # 1.0 = 依錄製速度, 0 = 盡可能快
+        self.repeat = repeat      # 重播次數, 0 = 無限重播
+        self.logger = logger or logging.getLogger('HARDWAREMONITOR')
+        self.parser = TegrastatsParser()
+        self.file = None
+        self.passes = 0
+        self.next_deadline = None
+        self.last_timestamp = None
+
+    def start(self):
+        if self.file is None:
+            self.file = open(self.path)
+            if self.repeat != 1 and not self.file.seekable():  # FIFO 無法 seek, 只能重播一次
+                self.logger.error(f'replay {self.path} is not seekable, repeat {self.repeat} -> 1')
+                self.repeat = 1
+
+    def read(self):
+        self.start()
+        output_line = self.file.readline()
+        if output_line == '':
+            self.passes += 1
+            if self.repeat != 0 and self.passes >= self.repeat:
+                self.exhausted = True
+                return None
+            self.file.seek(0)
+            output_line = self.file.readline()
+            if output_line == '':  # 空檔案, 不再重播
+                self.exhausted = True
+                return None
+        sample = self.parser.parse(output_line)
+        if sample is not None and self.speed > 0:
+            self.wait(sample)
+        return sample
+
+    # 依錄製的時間間隔等待
+    def wait(self, sample: TegrastatsSample):
+        delay = self.interval
+        if sample.timestamp is not None:
+            timestamp = time.mktime(time.strptime(sample.timestamp, '%m-%d-%Y %H:%M:%S'))
+            if self.last_timestamp is not None and timestamp > self.last_timestamp:
+                delay = timestamp - self.last_timestamp
+            self.last_timestamp = timestamp
+        now = time.monotonic()
+        if self.next_deadline is None:
+            self.next_deadline = now
+            return
+        self.next_deadline += delay / self.speed
+        if self.next_deadline > now:
+            time.sleep(self.next_deadline - now)
+
+    def stop(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# 直接讀取 procfs / sysfs, 不需要 tegrastats; 以 monotonic deadline 排程, 處理時間不會累積成漂移
+class SysfsSampler(Sampler):
+
+    def __init__(self, root: str = '/', interval: float = 1.0) -> None:
+        super().__init__(interval)
+        self.collector = SysfsCollector(root)
+        self.next_deadline = None
+
+    def start(self):
+        self.collector.open()
+
+    def read(self):
+        now = time.monotonic()
+        if self.next_deadline is not None and self.next_deadline > now:
+            time.sleep(self.next_deadline - now)
+        self.next_deadline = max(now, self.next_deadline or now) + self.interval
+        return self.collector.read_into(TegrastatsSample())
+
+    # 已排定的下一次取樣依新的間隔調整 (由慢變快時不必等完舊的間隔)
+    def set_interval(self, interval: float):
+        if self.next_deadline is not None:
+            self.next_deadline += interval - self.interval
+        self.interval = interval
+
+    def stop(self):
+        self.collector.close()
+
+
+# parameters.xml 的 Sampler_Backend / --sampler 可選擇的來源
+SAMPLER_BACKENDS = {
+    'tegrastats': TegrastatsSampler,
+    'sysfs': SysfsSampler,
+}
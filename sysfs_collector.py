@@ -0,0 +1,150 @@
+import os
+import glob
+from tegrastats_parser import TegrastatsSample
+
+# devfreq GPU 使用率節點 (0 ~ 1000), 依序嘗試
+GPU_LOAD_PATHS = ['/sys/devices/gpu.0/load', '/sys/devices/platform/gpu.0/load', '/sys/devices/platform/17000000.ga10b/load', '/sys/devices/platform/17000000.gv11b/load']
+
+_MEMINFO_KEYS = (b'MemTotal:', b'MemAvailable:', b'MemFree:', b'SwapTotal:', b'SwapFree:', b'SwapCached:')
+
+
+# 直接讀取 procfs / sysfs: 檔案只開啟一次, 每次以 os.preadv 讀入預先配置的 buffer
+class SysfsCollector:
+
+    def __init__(self, root: str = '/') -> None:
+        self.root = root
+        self.buffer = bytearray(8192)  # /proc/stat 只需要開頭的 cpu 行
+        self.view = memoryview(self.buffer)
+        self.stat_fd = None
+        self.meminfo_fd = None
+        self.gpu_fd = None
+        self.zone_fds = []  # [(name, fd)]
+        self.freq_fds = []  # 每顆核心 scaling_cur_freq, 不存在時為 None
+        self.last_cpu_times = None
+
+    def path(self, path: str) -> str:
+        return os.path.join(self.root, path.lstrip('/'))
+
+    # 開啟所有需要的檔案
+    def open(self):
+        if self.stat_fd is not None:
+            return
+        self.stat_fd = os.open(self.path('/proc/stat'), os.O_RDONLY)
+        self.meminfo_fd = os.open(self.path('/proc/meminfo'), os.O_RDONLY)
+        for path in GPU_LOAD_PATHS:
+            self.gpu_fd = self.open_optional(path)
+            if self.gpu_fd is not None:
+                break
+        for zone in sorted(glob.glob(self.path('/sys/class/thermal/thermal_zone*'))):
+            try:
+                with open(os.path.join(zone, 'type')) as file:
+                    name = file.read().strip().split('-')[0]  # CPU-therm -> CPU
+                self.zone_fds.append((name, os.open(os.path.join(zone, 'temp'), os.O_RDONLY)))
+            except OSError:
+                continue
+        cores = self.count_cores()
+        self.freq_fds = [self.open_optional(f'/sys/devices/system/cpu/cpu{core}/cpufreq/scaling_cur_freq') for core in range(cores)]
+
+    def open_optional(self, path: str):
+        try:
+            return os.open(self.path(path), os.O_RDONLY)
+        except OSError:
+            return None
+
+    def close(self):
+        fds = [self.stat_fd, self.meminfo_fd, self.gpu_fd] + [fd for _, fd in self.zone_fds] + self.freq_fds
+        for fd in fds:
+            if fd is not None:
+                os.close(fd)
+        self.stat_fd = None
+        self.meminfo_fd = None
+        self.gpu_fd = None
+        self.zone_fds = []
+        self.freq_fds = []
+
+    # 由 offset 0 重新讀取, 回傳 buffer 的 memoryview (下一次讀取前有效)
+    def pread(self, fd: int) -> memoryview:
+        size = os.preadv(fd, [self.buffer], 0)
+        return self.view[:size]
+
+    def read_int(self, fd: int):
+        try:
+            return int(self.pread(fd))
+        except (OSError, ValueError):
+            return None
+
+    def count_cores(self) -> int:
+        data = self.pread(self.stat_fd).tobytes()
+        return sum(1 for line in data.split(b'\n') if line[:3] == b'cpu' and line[3:4].isdigit())
+
+    # 讀取一次, 寫入 TegrastatsSample
+    def read_into(self, sample: TegrastatsSample):
+        self.open()
+        self.read_cpu(sample)
+        self.read_memory(sample)
+        self.read_thermal_zones(sample)
+        gpu_load = self.read_int(self.gpu_fd) if self.gpu_fd is not None else None
+        if gpu_load is not None:
+            sample.gr3d_load = gpu_load // 10
+        return sample
+
+    # 讀取一次, 直接更新 CPUInfo / RAMInfo / GPUInfo
+    def collect(self, cpu, ram, gpu):
+        sample = self.read_into(TegrastatsSample())
+        if len(sample.cpu_loads) > 0:
+            cpu.usage = sample.cpu_usage
+        if sample.ram_total > 0:
+            ram.usage = sample.ram_usage
+        gpu.usage = sample.gpu_usage
+        cpu_temperature = sample.cpu_temperature
+        if cpu_temperature is not None:
+            cpu.temperature = int(cpu_temperature)
+        gpu_temperature = sample.gpu_temperature
+        if gpu_temperature is not None:
+            gpu.temperature = int(gpu_temperature)
+
+    # /proc/stat 每顆核心的使用率 (與上一次讀取的差值), 第一次讀取只記錄基準
+    def read_cpu(self, sample: TegrastatsSample):
+        data = self.pread(self.stat_fd).tobytes()
+        cpu_times = []
+        for line in data.split(b'\n'):
+            if line[:3] != b'cpu':
+                break
+            if not line[3:4].isdigit():
+                continue
+            values = line.split()
+            idle = int(values[4]) + int(values[5])
+            total = sum(map(int, values[1:]))
+            cpu_times.append((idle, total))
+        if self.last_cpu_times is not None:
+            for core, (idle, total) in enumerate(cpu_times):
+                last_idle, last_total = self.last_cpu_times[core] if core < len(self.last_cpu_times) else (idle, total)
+                total_delta = total - last_total
+                sample.cpu_loads.append(0 if total_delta <= 0 else round((total_delta - (idle - last_idle)) * 100 / total_delta))
+                freq_fd = self.freq_fds[core] if core < len(self.freq_fds) else None
+                freq = self.read_int(freq_fd) if freq_fd is not None else None
+                sample.cpu_freqs.append(freq // 1000 if freq is not None else None)  # kHz -> MHz
+        self.last_cpu_times = cpu_times
+
+    # /proc/meminfo (kB -> MB)
+    def read_memory(self, sample: TegrastatsSample):
+        data = self.pread(self.meminfo_fd).tobytes()
+        meminfo = {}
+        for key in _MEMINFO_KEYS:
+            index = data.find(key)
+            if index >= 0:
+                meminfo[key] = int(data[index + len(key):data.index(b'kB', index)])
+        total = meminfo.get(b'MemTotal:', 0)
+        available = meminfo.get(b'MemAvailable:', meminfo.get(b'MemFree:', 0))
+        sample.ram_total = total // 1024
+        sample.ram_used = (total - available) // 1024
+        sample.swap_total = meminfo.get(b'SwapTotal:', 0) // 1024
+        sample.swap_used = (meminfo.get(b'SwapTotal:', 0) - meminfo.get(b'SwapFree:', 0)) // 1024
+        sample.swap_cached = meminfo.get(b'SwapCached:', 0) // 1024
+
+    # /sys/class/thermal/thermal_zone*/temp (m°C)
+    def read_thermal_zones(self, sample: TegrastatsSample):
+        for name, fd in self.zone_fds:
+            value = self.read_int(fd)
+            if value is not None:
+                sample.temperatures[name] = value / 1000
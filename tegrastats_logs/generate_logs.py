@@ -0,0 +1,71 @@
+import os
+import random
+
+# 產生合成的 tegrastats 輸出 (nano / tx2 / xavier / orin 各 60 行), 不是實機錄製
+# 欄位格式與各機型的 tegrastats 相同, 數值為亂數: RAM 每行大幅跳動、Xavier 核心每 3 行開關一次、電源軌平均值固定
+# 只適合量測解析 / 重播的成本, 不代表實際負載; 固定 seed, 重新執行會得到相同的檔案
+LOGS_DIR = os.path.dirname(os.path.abspath(__file__))
+LINES = 60
+
+
+def cores(count: int, frequencies: list, off=()) -> str:
+    return ','.join('off' if core in off else f'{random.randint(0, 100)}%@{random.choice(frequencies)}' for core in range(count))
+
+
+def temperature(base: float) -> float:
+    return base + random.choice([0, 0.25, 0.5, 0.75, 1.0, -0.5])
+
+
+def nano():
+    for index in range(LINES):
+        ram = random.randint(1500, 3500)
+        cpu = random.randint(200, 600)
+        gpu = random.randint(0, 900)
+        yield (f"RAM {ram}/3956MB (lfb {random.randint(20, 90)}x4MB) SWAP {random.randint(0, 40)}/1978MB (cached 0MB) "
+               f"IRAM 0/252kB(lfb 252kB) CPU [{cores(4, [102, 921, 1479])}] EMC_FREQ {random.randint(0, 30)}%@1600 "
+               f"GR3D_FREQ {random.randint(0, 99)}%@{random.choice([76, 614, 921])} APE 25 PLL@{temperature(31)}C CPU@{temperature(34.5)}C "
+               f"PMIC@100C GPU@{temperature(32)}C AO@{temperature(41)}C thermal@{temperature(33.25)}C "
+               f"POM_5V_IN {cpu + gpu + 1800}/{2300 + index} POM_5V_GPU {gpu}/{gpu // 2} POM_5V_CPU {cpu}/{cpu - 10}")
+
+
+def tx2():
+    for index in range(LINES):
+        ram = random.randint(1500, 7000)
+        gpu = random.randint(0, 2000)
+        yield (f"RAM {ram}/7854MB (lfb {random.randint(500, 1100)}x4MB) SWAP 0/3927MB (cached 0MB) "
+               f"CPU [{cores(6, [345, 2035], off=(1, 2))}] EMC_FREQ {random.randint(0, 30)}%@1866 "
+               f"GR3D_FREQ {random.randint(0, 99)}%@{random.choice([114, 1300])} APE 150 PLL@{temperature(33)}C MCPU@{temperature(33)}C "
+               f"PMIC@100C Tboard@29C GPU@{temperature(31.5)}C BCPU@{temperature(33)}C thermal@{temperature(32.4)}C Tdiode@{temperature(31)}C "
+               f"VDD_SYS_GPU {gpu}/{gpu // 2 + 100} VDD_SYS_SOC 381/381 VDD_4V0_WIFI 0/0 VDD_IN {1900 + gpu}/{2400} VDD_SYS_CPU 152/152 VDD_SYS_DDR 343/343")
+
+
+def xavier():
+    for index in range(LINES):
+        ram = random.randint(3000, 30000)
+        yield (f"RAM {ram}/31919MB (lfb {random.randint(3000, 6400)}x4MB) SWAP 0/15959MB (cached 0MB) "
+               f"CPU [{cores(8, [1190, 2265], off=(4, 5, 6, 7) if index % 3 == 0 else ())}] EMC_FREQ {random.randint(0, 30)}%@2133 "
+               f"GR3D_FREQ {random.randint(0, 99)}%@1377 APE 150 MTS fg 0% bg 0% AO@{temperature(35)}C GPU@{temperature(35.5)}C "
+               f"Tdiode@{temperature(37.75)}C PMIC@100C AUX@{temperature(34.5)}C CPU@{temperature(36)}C thermal@{temperature(35.25)}C Tboard@35C "
+               f"GPU {random.randint(0, 5000)}/1200 CPU {random.randint(150, 4000)}/1500 SOC 1395/1395 CV 0/0 VDDRQ 310/310 SYS5V 1767/1767")
+
+
+def orin():
+    for index in range(LINES):
+        ram = random.randint(4000, 28000)
+        yield (f"11-17-2022 16:41:{index % 60:02d} RAM {ram}/30536MB (lfb {random.randint(3000, 5300)}x4MB) SWAP 0/15268MB (cached 0MB) "
+               f"CPU [{cores(12, [729, 2201])}] EMC_FREQ {random.randint(0, 30)}%@2133 GR3D_FREQ {random.randint(0, 99)}%@[{random.choice([0, 1300])},{random.choice([0, 1300])}] "
+               f"VIC_FREQ 729 APE 174 CV0@-256C CPU@{temperature(43.468)}C Tboard@31C SOC2@{temperature(39.343)}C Tdiode@33.5C SOC0@{temperature(40.218)}C "
+               f"CV1@-256C GPU@{temperature(40)}C tj@{temperature(43.468)}C SOC1@{temperature(39.437)}C CV2@-256C "
+               f"VDD_GPU_SOC {random.randint(2000, 9000)}mW/2389mW VDD_CPU_CV {random.randint(300, 6000)}mW/398mW VIN_SYS_5V0 3128mW/3128mW NC 0mW/0mW VDDQ_VDD2_1V8AO 302mW/302mW NC 0mW/0mW")
+
+
+def main(logs_dir: str = LOGS_DIR):
+    random.seed(7)
+    for board, generate in [('nano', nano), ('tx2', tx2), ('xavier', xavier), ('orin', orin)]:
+        with open(os.path.join(logs_dir, f'{board}.log'), 'w') as file:
+            for line in generate():
+                file.write(line + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import re
+
+# tegrastats 每一行的欄位 (Nano / TX2 / Xavier / Orin 皆適用), 以單一 regex 一次掃描
+_TOKEN_PATTERN = re.compile(
+    r'(?P<timestamp>^\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2})'
+    r'|(?P<ram>RAM (?P<ram_used>\d+)/(?P<ram_total>\d+)MB \(lfb (?P<lfb_blocks>\d+)x(?P<lfb_size>\d+)MB\))'
+    r'|(?P<swap>SWAP (?P<swap_used>\d+)/(?P<swap_total>\d+)MB \(cached (?P<swap_cached>\d+)MB\))'
+    r'|(?P<iram>IRAM (?P<iram_used>\d+)/(?P<iram_total>\d+)kB ?\(lfb (?P<iram_lfb>\d+)kB\))'
+    r'|(?P<cpu>CPU \[(?P<cores>[^\]]*)\])'
+    r'|(?P<engine>(?P<engine_name>[A-Z][A-Z0-9_]*) (?P<engine_value>\d+)(?:%(?:@\[?(?P<engine_freqs>[\d,]+)\]?)?)?(?=\s|$))'
+    r'|(?P<temperature>(?P<sensor>\w+)@(?P<degree>-?\d+(?:\.\d+)?)C)'
+    r'|(?P<rail>(?P<rail_name>\w+) (?P<rail_current>\d+)(?:mW)?/(?P<rail_average>\d+)(?:mW)?(?=\s|$))'
+)
+
+# tegrastats 以 -256C 表示關閉的感測器
+_SENSOR_OFF = -256.0
+
+
+class TegrastatsSample:
+    __slots__ = ('timestamp', 'ram_used', 'ram_total', 'ram_lfb_blocks', 'ram_lfb_size',
+                 'swap_used', 'swap_total', 'swap_cached', 'iram_used', 'iram_total', 'iram_lfb',
+                 'cpu_loads', 'cpu_freqs', 'emc_load', 'emc_freq', 'gr3d_load', 'gr3d_freqs',
+                 'engines', 'temperatures', 'rails')
+
+    def __init__(self) -> None:
+        self.timestamp = None        # 'MM-DD-YYYY HH:MM:SS', 舊版 tegrastats 沒有
+        self.ram_used = 0            # MB
+        self.ram_total = 0           # MB
+        self.ram_lfb_blocks = 0
+        self.ram_lfb_size = 0        # MB
+        self.swap_used = 0           # MB
+        self.swap_total = 0          # MB
+        self.swap_cached = 0         # MB
+        self.iram_used = 0           # kB
+        self.iram_total = 0          # kB
+        self.iram_lfb = 0            # kB
+        self.cpu_loads = []          # 每顆核心使用率 %, 關閉的核心為 None
+        self.cpu_freqs = []          # 每顆核心頻率 MHz, 關閉的核心為 None
+        self.emc_load = 0            # %
+        self.emc_freq = None         # MHz
+        self.gr3d_load = 0           # %
+        self.gr3d_freqs = []         # MHz, Orin 每個 GPC 一個值
+        self.engines = {}            # {'APE': 150, 'VIC_FREQ': 729, ...} MHz
+        self.temperatures = {}       # {'CPU': 34.5, 'GPU': 32.0, ...} C
+        self.rails = {}              # {'VDD_IN': (current, average), ...} mW
+
+    # RAM 使用率 (%)
+    @property
+    def ram_usage(self) -> float:
+        if self.ram_total == 0:
+            return 0
+        return round(self.ram_used * 100 / self.ram_total, 1)
+
+    # CPU 平均使用率 (%), 只計算啟用中的核心
+    @property
+    def cpu_usage(self) -> float:
+        loads = [load for load in self.cpu_loads if load is not None]
+        if len(loads) == 0:
+            return 0
+        return round(sum(loads) / len(loads), 1)
+
+    # GPU 使用率 (%)
+    @property
+    def gpu_usage(self) -> float:
+        return round(float(self.gr3d_load), 1)
+
+    # CPU 溫度 (C), TX2 只有 BCPU / MCPU
+    @property
+    def cpu_temperature(self):
+        value = self.temperature('CPU')
+        if value is None:
+            value = self.temperature('BCPU')
+        return value
+
+    # GPU 溫度 (C)
+    @property
+    def gpu_temperature(self):
+        return self.temperature('GPU')
+
+    # 依名稱取得溫度, 不分大小寫 (Orin Nano 使用 cpu@ / gpu@); 關閉的感測器回傳 None
+    def temperature(self, name: str):
+        value = self.temperatures.get(name)
+        if value is None:
+            value = self.temperatures.get(name.lower())
+        if value is None or value == _SENSOR_OFF:
+            return None
+        return value
+
+
+class TegrastatsParser:
+
+    def __init__(self) -> None:
+        self.pattern = _TOKEN_PATTERN
+
+    # 解析一行 tegrastats 輸出, 無法辨識的行回傳 None
+    def parse(self, line: str):
+        sample = TegrastatsSample()
+        found = False
+        for match in self.pattern.finditer(line):
+            kind = match.lastgroup
+            if kind == 'ram':
+                found = True
+                sample.ram_used = int(match.group('ram_used'))
+                sample.ram_total = int(match.group('ram_total'))
+                sample.ram_lfb_blocks = int(match.group('lfb_blocks'))
+                sample.ram_lfb_size = int(match.group('lfb_size'))
+            elif kind == 'cpu':
+                found = True
+                self._parse_cores(match.group('cores'), sample)
+            elif kind == 'temperature':
+                sample.temperatures[match.group('sensor')] = float(match.group('degree'))
+            elif kind == 'rail':
+                sample.rails[match.group('rail_name')] = (int(match.group('rail_current')), int(match.group('rail_average')))
+            elif kind == 'engine':
+                self._parse_engine(match.group('engine_name'), match.group('engine_value'), match.group('engine_freqs'), sample)
+            elif kind == 'swap':
+                sample.swap_used = int(match.group('swap_used'))
+                sample.swap_total = int(match.group('swap_total'))
+                sample.swap_cached = int(match.group('swap_cached'))
+            elif kind == 'iram':
+                sample.iram_used = int(match.group('iram_used'))
+                sample.iram_total = int(match.group('iram_total'))
+                sample.iram_lfb = int(match.group('iram_lfb'))
+            elif kind == 'timestamp':
+                sample.timestamp = match.group('timestamp')
+        return sample if found else None
+
+    @staticmethod
+    def _parse_cores(cores: str, sample: TegrastatsSample):
+        for core in cores.split(','):
+            if core == 'off' or '%@' not in core:
+                sample.cpu_loads.append(None)
+                sample.cpu_freqs.append(None)
+            else:
+                load, freq = core.split('%@')
+                sample.cpu_loads.append(int(load))
+                sample.cpu_freqs.append(int(freq))
+
+    @staticmethod
+    def _parse_engine(name: str, value: str, freqs: str, sample: TegrastatsSample):
+        if name == 'EMC_FREQ':
+            sample.emc_load = int(value)
+            sample.emc_freq = int(freqs) if freqs else None
+        elif name == 'GR3D_FREQ':
+            sample.gr3d_load = int(value)
+            sample.gr3d_freqs = [int(freq) for freq in freqs.split(',')] if freqs else []
+        else:
+            sample.engines[name] = int(value)
@@ -0,0 +1,115 @@
+import math
+import time
+from collections import deque
+from tkinter import Canvas
+from sample_history import SampleHistory
+
+LABEL_WIDTH = 150
+# 固定順序的序列, 硬碟序列接在後面
+FIXED_SERIES = ['cpu.usage', 'cpu.temperature', 'gpu.usage', 'gpu.temperature', 'ram.usage']
+COLORS = {'usage': '#1f77b4', 'temperature': '#d62728'}
+
+
+# 序列的顯示名稱與單位: 'drive./dev/sda1.usage' -> ('/dev/sda1 usage', '%')
+def series_label(name: str) -> tuple:
+    prefix, metric = name.rsplit('.', 1)
+    device = prefix[len('drive.'):] if prefix.startswith('drive.') else prefix.upper()
+    return f'{device} {metric}', '%' if metric == 'usage' else 'C'
+
+
+# 以 SampleHistory 為資料來源的走勢圖 (每個序列一列), 新樣本只平移既有線段並加上新線段
+class TrendChart:
+
+    def __init__(self, parent, history: SampleHistory, width: int = 360, row_height: int = 36, step: int = 3, budget: float = 0.02) -> None:
+        self.history = history
+        self.width = width
+        self.row_height = row_height
+        self.step = step                # 每筆樣本的水平間距 (px)
+        self.points = width // step     # 畫面上最多的筆數
+        self.budget = budget            # 繪圖最多使用的 CPU 比例, 超過時合併多筆一起畫
+        self.canvas = Canvas(parent, width=LABEL_WIDTH + width, height=row_height, bg='white', highlightthickness=0)
+        self.names = []
+        self.segments = {}     # {name: deque of (樣本序號, canvas line id)}
+        self.last_y = {}       # {name: 最後一點的 y, NaN 時為 None}
+        self.value_texts = {}  # {name: 目前數值的 canvas text id}
+        self.last_timestamp = None
+        self.drawn = 0  # 已畫的樣本數
+        self.next_draw = 0
+
+    def series_names(self) -> list:
+        names = self.history.names()
+        drives = sorted(name for name in names if name.startswith('drive.'))
+        return [name for name in FIXED_SERIES if name in names] + drives
+
+    def y_of(self, row: int, value) -> float:
+        ratio = min(max(value / 100, 0), 1)  # 使用率與溫度都以 0 ~ 100 顯示
+        top = row * self.row_height + 4
+        return top + (1 - ratio) * (self.row_height - 8)
+
+    # 序列變動 (例如新的硬碟) 或第一次顯示時重畫全部
+    def rebuild(self):
+        canvas = self.canvas
+        canvas.delete('all')
+        self.names = self.series_names()
+        self.segments = {name: deque() for name in self.names}
+        self.last_y = {}
+        self.value_texts = {}
+        canvas.config(height=max(len(self.names), 1) * self.row_height)
+        right = LABEL_WIDTH + self.width
+        for row, name in enumerate(self.names):
+            label, unit = series_label(name)
+            top = row * self.row_height
+            canvas.create_line(LABEL_WIDTH, top + self.row_height - 1, right, top + self.row_height - 1, fill='#e0e0e0')
+            canvas.create_text(4, top + self.row_height / 2 - 7, text=label, anchor='w')
+            self.value_texts[name] = canvas.create_text(4, top + self.row_height / 2 + 8, text='-', anchor='w', fill='#555555')
+        self.last_timestamp = None
+        self.drawn = 0
+        self.draw_new()
+
+    # 依資料更新 (由 GUI 的 after() 呼叫), 超過 CPU 比例時延後到下一次
+    def update(self):
+        now = time.monotonic()
+        if now < self.next_draw:
+            return
+        start = time.perf_counter()
+        if self.series_names() != self.names:
+            self.rebuild()
+        else:
+            self.draw_new()
+        self.next_draw = now + (time.perf_counter() - start) / self.budget
+
+    # 畫出 last_timestamp 之後的新樣本
+    def draw_new(self):
+        count = min(self.history.count_after(self.last_timestamp), self.points)
+        if count == 0:
+            return
+        canvas = self.canvas
+        shift = self.step * count
+        canvas.move('data', -shift, 0)
+        right = LABEL_WIDTH + self.width
+        last_timestamp = self.last_timestamp
+        for row, name in enumerate(self.names):
+            timestamps, segments = self.history.window(name, count)
+            if timestamps:
+                last_timestamp = timestamps[-1][-1]
+            values = [value for segment in segments for value in segment]
+            color = COLORS[name.rsplit('.', 1)[1]]
+            lines = self.segments[name]
+            previous = self.last_y.get(name)
+            x = right - shift
+            for index, value in enumerate(values, self.drawn + 1):
+                x += self.step
+                if value != value:  # NaN
+                    previous = None
+                    continue
+                y = self.y_of(row, value)
+                if previous is not None:
+                    lines.append((index, canvas.create_line(x - self.step, previous, x, y, fill=color, tags='data')))
+                previous = y
+            self.last_y[name] = previous
+            while lines and lines[0][0] <= self.drawn + count - self.points:  # 已移出畫面左側
+                canvas.delete(lines.popleft()[1])
+            if values and not math.isnan(values[-1]):
+                canvas.itemconfigure(self.value_texts[name], text=f'{values[-1]:g}{series_label(name)[1]}')
+        self.drawn += count
+        self.last_timestamp = last_timestamp
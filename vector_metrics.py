@@ -0,0 +1,133 @@
+import numpy as np
+from tegrastats_parser import TegrastatsSample
+
+# 向量序列: (群組, 輸出名稱格式, 是否積分為能量, extractor(sample) -> (instances, values))
+GROUPS = [
+    ('cpu.core.usage', 'cpu.{}.usage', False, lambda sample: ([f'core{core}' for core in range(len(sample.cpu_loads))], sample.cpu_loads)),
+    ('cpu.core.frequency', 'cpu.{}.frequency', False, lambda sample: ([f'core{core}' for core in range(len(sample.cpu_freqs))], sample.cpu_freqs)),
+    ('power', 'power.{}', True, lambda sample: (list(sample.rails), [rail[0] for rail in sample.rails.values()])),  # 瞬間功率 mW
+]
+NAME_FORMATS = {group: name_format for group, name_format, _, _ in GROUPS}
+
+
+# 單一群組 (例如每顆核心的使用率) 的向量: 每筆樣本一列, 累積 capacity 列後一次以 NumPy 併入期間統計
+class VectorSeries:
+
+    def __init__(self, instances: list, capacity: int = 256, integrate: bool = False) -> None:
+        width = len(instances)
+        self.instances = instances
+        self.integrate = integrate  # 功率: 以兩筆樣本的間隔積分為能量 (J)
+        self.block = np.full((capacity, width), np.nan)
+        self.times = np.zeros(capacity)
+        self.count = 0
+        self.latest = np.full(width, np.nan)  # 最新一筆樣本, 關閉的核心為 NaN
+        self.last_time = None                  # 上一次 fold 的最後一筆 (積分時接續)
+        self.last_row = None
+        self.reset_period()
+
+    def reset_period(self):
+        width = len(self.instances)
+        self.samples = np.zeros(width)  # 每個實例的有效筆數 (不含 NaN)
+        self.total = np.zeros(width)
+        self.total_sq = np.zeros(width)
+        self.max = np.full(width, -np.inf)
+        self.energy = np.zeros(width)
+
+    def append(self, timestamp: float, values: list):
+        row = self.block[self.count]
+        row[:] = values  # None -> NaN
+        self.latest = row  # 下一次寫入這一列是 capacity 筆之後
+        self.times[self.count] = timestamp
+        self.count += 1
+        if self.count == len(self.block):
+            self.fold()
+
+    # 將累積的列併入期間統計 (每欄一次向量運算)
+    def fold(self):
+        if self.count == 0:
+            return
+        block = self.block[:self.count]
+        valid = ~np.isnan(block)
+        filled = np.where(valid, block, 0)
+        self.samples += valid.sum(axis=0)
+        self.total += filled.sum(axis=0)
+        self.total_sq += (filled * filled).sum(axis=0)
+        self.max = np.maximum(self.max, np.where(valid, block, -np.inf).max(axis=0))
+        if self.integrate:
+            # 每筆的功率持續到下一筆: sum(P[i-1] * (t[i] - t[i-1])), mW x s -> J
+            times = self.times[:self.count]
+            if self.last_time is not None:
+                self.energy += np.nan_to_num(self.last_row) * (max(times[0] - self.last_time, 0) / 1000)
+            self.energy += (filled[:-1] * (np.maximum(np.diff(times), 0) / 1000)[:, None]).sum(axis=0)
+            self.last_time = times[-1]
+            self.last_row = filled[-1].copy()
+        self.count = 0
+
+    # 取出期間統計並重新開始: {instance: {'avg', 'max', 'stdev'[, 'energy']}}
+    def take_summary(self) -> dict:
+        self.fold()
+        samples = np.maximum(self.samples, 1)
+        mean = self.total / samples
+        stdev = np.sqrt(np.maximum(self.total_sq / samples - mean * mean, 0))
+        columns = [mean.round(1).tolist(), self.max.tolist(), stdev.round(2).tolist()]  # 一次轉成 Python float
+        if self.integrate:
+            columns.append(self.energy.round(3).tolist())
+        keys = ('avg', 'max', 'stdev', 'energy')
+        summary = {}
+        for index, instance in enumerate(self.instances):
+            if self.samples[index] > 0:
+                summary[instance] = {key: column[index] for key, column in zip(keys, columns)}
+        self.reset_period()
+        return summary
+
+
+# 每筆樣本的向量指標: 每顆核心的使用率 / 頻率, 每個電源軌的功率
+class VectorMetrics:
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity = capacity  # 每個群組累積幾列才併入統計, 記憶體固定
+        self.series = {}  # {group: VectorSeries}
+
+    def record(self, timestamp: float, sample: TegrastatsSample):
+        for group, _, integrate, extract in GROUPS:
+            instances, values = extract(sample)
+            if not instances:
+                continue
+            series = self.series.get(group)
+            if series is None or series.instances != instances:  # 核心 / 電源軌組成改變 (例如重播其他機型的 log)
+                series = VectorSeries(instances, self.capacity, integrate)
+                self.series[group] = series
+            series.append(timestamp, values)
+
+    # 最新一筆樣本的 (instances, 向量), 沒有資料時為 None
+    def latest(self, group: str):
+        series = self.series.get(group)
+        if series is None:
+            return None
+        return series.instances, series.latest
+
+    # 最新一筆樣本各實例的 mean / max / min / stdev (通報使用), 沒有資料時為 None
+    def reduce(self, group: str, how: str):
+        series = self.series.get(group)
+        if series is None:
+            return None
+        values = series.latest[~np.isnan(series.latest)]
+        if len(values) == 0:
+            return None
+        return round(float(getattr(values, 'std' if how == 'stdev' else how)()), 2)
+
+    # 本次定期紀錄期間到目前為止的能量 (J)
+    def energy(self, instance: str) -> float:
+        series = self.series.get('power')
+        if series is None or instance not in series.instances:
+            return 0
+        series.fold()
+        return float(series.energy[series.instances.index(instance)])
+
+    # 取出定期紀錄期間的統計並重新開始: {'cpu.core0.usage': {'avg', 'max', 'stdev'}, 'power.VDD_IN': {..., 'energy'}, ...}
+    def take_period_summary(self) -> dict:
+        summaries = {}
+        for group, series in self.series.items():
+            for instance, values in series.take_summary().items():
+                summaries[NAME_FORMATS[group].format(instance)] = values
+        return summaries